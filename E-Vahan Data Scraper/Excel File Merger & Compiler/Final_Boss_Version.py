@@ -1,101 +1,288 @@
+import numpy as np
 import pandas as pd
 import os
-import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from report_types import LONG_COLUMNS, parse_title, to_long
+from excel_writer import write_excel_streaming
+from dedup import deduplicate, write_duplicate_report
 
-def parse_title(title):
-    """Extract RTO Code, Name, and State from the title string"""
-    pattern = r'Maker Month Wise Data\s+of\s+(.+?)\s+-\s+(.+?)\s*,\s*(.+?)\s*\(\d{4}\)'
-    match = re.search(pattern, title)
-    if match:
-        return {
-            'RTO Name': match.group(1).strip(),
-            'RTO Code': match.group(2).strip(),
-            'State': match.group(3).strip()
-        }
-    raise ValueError(f"Title format not recognized: {title}")
-
-def process_excel_file(file_path):
-    """Process individual Excel file and return formatted DataFrame"""
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+# Rows scanned for the title and month header; exports never put them lower
+HEADER_SCAN_ROWS = 10
+
+# Leading rows whose filled-cell mask identifies a layout (title, headers, first data row)
+SIGNATURE_ROWS = 5
+
+# Layouts already discovered, keyed by shape_signature()
+_LAYOUT_CACHE = {}
+
+def shape_signature(df):
+    """Cheap key for the layout of a raw cell grid: width plus the filled-cell mask of the leading rows"""
+    mask = np.zeros((SIGNATURE_ROWS, df.shape[1]), dtype=bool)
+    head = df.iloc[:SIGNATURE_ROWS].notna().to_numpy()
+    mask[:head.shape[0]] = head
+    return (df.shape[1], mask.tobytes())
+
+def detect_layout(df):
+    """Locate the title, month header and data block of a raw export in one pass over its header rows"""
+    head = df.iloc[:HEADER_SCAN_ROWS]
+    cells = head.astype(str).apply(lambda col: col.str.strip().str.upper()).to_numpy()
+    filled = head.notna().to_numpy()
+    is_month = np.isin(cells, MONTHS) & filled
+
+    # The month header is the first row below the title carrying month names
+    month_rows = np.flatnonzero(is_month[1:].any(axis=1)) + 1
+    if not len(month_rows):
+        raise ValueError("Month row not found")
+    months_row = int(month_rows[0])
+    month_cols = [int(c) for c in np.flatnonzero(is_month[months_row])]
+
+    # The category label column is the last column before the months
+    label_col = month_cols[0] - 1
+
+    return {
+        'title_row': 0,
+        'months_row': months_row,
+        'data_start': months_row + 1,
+        'label_col': label_col,
+        'month_cols': month_cols,
+        'months': [cells[months_row, c] for c in month_cols],
+    }
+
+def get_layout(df):
+    """Return the layout for a raw grid, reusing a cached one when the shape signature matches"""
+    signature = shape_signature(df)
+    layout = _LAYOUT_CACHE.get(signature)
+    # The signature covers SIGNATURE_ROWS rows but the month row can sit lower, so a short
+    # sheet can share a signature with a layout whose month row it does not have
+    if layout is not None and layout['months_row'] < len(df):
+        # Guard against a signature collision with a cheap spot check of the first month cell
+        first = df.iat[layout['months_row'], layout['month_cols'][0]]
+        if str(first).strip().upper() == layout['months'][0]:
+            return layout
+    layout = detect_layout(df)
+    _LAYOUT_CACHE[signature] = layout
+    return layout
+
+def process_excel_file(file_path, engine='openpyxl'):
+    """Process individual Excel file and return its rows in the common long-format schema"""
     try:
         # Skip hidden temporary files
         if os.path.basename(file_path).startswith('~$'):
-            return pd.DataFrame()
+            return pd.DataFrame(columns=LONG_COLUMNS)
 
         # Read Excel without headers
-        df = pd.read_excel(file_path, header=None, engine='openpyxl')
-        
-        # Extract title and RTO info
-        title = df.iloc[0, 0]
-        rto_info = parse_title(title)
-        
-        # Find months row
-        months_row = None
-        for idx, row in df.iterrows():
-            if idx < 2:
-                continue  # Skip title and header rows
-            if pd.notna(row[2]) and re.match(r'^(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)$', 
-                                           str(row[2]).strip().upper()):
-                months_row = idx
-                break
-        
-        if not months_row:
-            print(f"Skipping {file_path}: Month row not found")
-            return pd.DataFrame()
-        
-        # Extract headers
-        months = df.iloc[months_row, 2:-1].values  # Exclude TOTAL column
-        months = [str(m).strip().upper() for m in months if pd.notna(m)]
-        
-        # Extract data
-        data_start = months_row + 1
-        headers = ['Maker'] + months + ['TOTAL']
-        data = df.iloc[data_start:, [1] + list(range(2, 2+len(months))) + [df.shape[1]-1]]
-        data.columns = headers
-        
-        # Clean data
-        data = data.dropna(subset=['Maker']).reset_index(drop=True)
-        data['Maker'] = data['Maker'].str.strip()
-        
-        # Add RTO information with correct column names
-        for col in ['RTO Code', 'RTO Name', 'State']:
-            data[col] = rto_info[col]
-        
-        # Reorder columns
-        final_columns = ['RTO Code', 'RTO Name', 'State', 'Maker'] + months + ['TOTAL']
-        return data[final_columns]
-    
+        df = pd.read_excel(file_path, header=None, engine=engine)
+
+        try:
+            layout = get_layout(df)
+        except ValueError as e:
+            print(f"Skipping {file_path}: {e}")
+            return pd.DataFrame(columns=LONG_COLUMNS)
+
+        # Recognise the report type and RTO from the title, then hand off to that type's mapper
+        title = df.iat[layout['title_row'], 0]
+        title_info = parse_title(str(title), file_path)
+        return to_long(df, layout, title_info)
+
     except Exception as e:
         print(f"Error processing {file_path}: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(columns=LONG_COLUMNS)
 
-def main(input_folder, output_file):
-    """Main function to process all Excel files"""
-    all_data = pd.DataFrame()
-    
-    # Process all Excel files in input folder and subfolders
+def to_wide(long_df):
+    """Pivot long-format rows back to one column per month plus TOTAL"""
+    months = [m for m in MONTHS if m in set(long_df['Month'])]
+    index = ['Report Type', 'RTO Code', 'RTO Name', 'State', 'Year', 'Category']
+    # Titles without a year leave Year empty; keep those rows and keep Year an integer
+    long_df = long_df.assign(Year=pd.to_numeric(long_df['Year']).astype('Int64'))
+    # groupby(dropna=False) rather than pivot_table, which drops rows with an empty key
+    counts = long_df.groupby(index + ['Month'], sort=False, dropna=False)['Count'].sum()
+    wide = counts.unstack('Month', fill_value=0)
+    wide = wide.reindex(index=counts.index.droplevel('Month').unique(), columns=months, fill_value=0)
+    wide['TOTAL'] = wide.sum(axis=1)
+    wide.columns.name = None
+    return wide.reset_index()
+
+# One row per (Year, Month, State, RTO, Report Type, Category) - the shape M_Query.md unpivots into
+TIDY_COLUMNS = ['Year', 'Month', 'State', 'RTO Code', 'RTO Name', 'Report Type', 'Category', 'Count']
+
+def memory_mb(df):
+    """Deep memory footprint of a DataFrame in MB"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def to_tidy(long_df):
+    """Compact long-format rows: categoricals for repeated labels, an ordered Month and int32 counts"""
+    tidy = long_df[TIDY_COLUMNS].copy()
+    for col in ['State', 'RTO Code', 'RTO Name', 'Report Type', 'Category']:
+        tidy[col] = tidy[col].astype('category')
+    tidy['Month'] = pd.Categorical(tidy['Month'], categories=MONTHS, ordered=True)
+    tidy['Year'] = pd.to_numeric(tidy['Year']).astype('Int16')
+    tidy['Count'] = tidy['Count'].astype('int32')
+    return tidy
+
+def save_output(df, output_file, sheets_per_file=None):
+    """Write the consolidated frame in the format implied by the output extension"""
+    suffix = Path(output_file).suffix.lower()
+    if suffix == '.parquet':
+        df.to_parquet(output_file, index=False)
+    elif suffix == '.csv':
+        df.to_csv(output_file, index=False)
+    else:
+        # Streamed in constant memory, rolling over to new sheets/files at Excel's row limit
+        for path, sheet, rows in write_excel_streaming(df, output_file, sheets_per_file=sheets_per_file):
+            print(f"  {path} [{sheet}]: {rows} rows")
+
+def iter_excel_files(input_folder):
+    """Yield every Excel file under input_folder as it is found"""
     for root, _, files in os.walk(input_folder):
         for file in files:
             if file.lower().endswith(('.xlsx', '.xls')):
-                file_path = os.path.join(root, file)
-                print(f"Processing: {file_path}")
-                df = process_excel_file(file_path)
+                yield os.path.join(root, file)
+
+def update_cube(cube_path, long_df):
+    """Merge the new rows into the aggregate cube; duckdb is only needed when a cube is requested"""
+    from aggregate_cube import AggregateCube
+    with AggregateCube(cube_path) as cube:
+        rows = cube.update(long_df)
+    print(f"Aggregate cube {cube_path} updated with {rows} RTO rows")
+
+def update_store(store_path, long_df, revision=None):
+    """Upsert the new rows into the multi-year history store"""
+    from timeseries_store import TimeSeriesStore
+    with TimeSeriesStore(store_path) as store:
+        changed, unchanged = store.upsert(long_df, revision)
+    print(f"History store {store_path}: {changed} rows new or revised, {unchanged} unchanged")
+
+def main(input_folder, output_file, tidy=False, sheets_per_file=None, engine='openpyxl', jobs=1,
+         dedup=True, cube=None, store=None, revision=None):
+    """Main function to process all Excel files of every report type"""
+    frames = []
+    worker = partial(process_excel_file, engine=engine)
+    files = iter_excel_files(input_folder)
+
+    # Drop re-downloaded copies of the same RTO before anything is parsed
+    if dedup:
+        files, duplicates = deduplicate(files, jobs)
+        if duplicates:
+            report_path = Path(output_file).with_name(f"{Path(output_file).stem}_duplicates.csv")
+            write_duplicate_report(duplicates, report_path)
+            print(f"Skipping {len(duplicates)} duplicate files; list saved to {report_path}")
+
+    # Process all Excel files in input folder and subfolders
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for df in executor.map(worker, files, chunksize=16):
                 if not df.empty:
-                    all_data = pd.concat([all_data, df], ignore_index=True)
-    
-    # Handle numeric columns
-    month_cols = [col for col in all_data.columns if col.upper() in [
-        'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 
-        'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']]
-    
-    for col in month_cols + ['TOTAL']:
-        all_data[col] = pd.to_numeric(all_data[col], errors='coerce').fillna(0).astype(int)
-    
+                    frames.append(df)
+    else:
+        for file_path in files:
+            print(f"Processing: {file_path}")
+            df = worker(file_path)
+            if not df.empty:
+                frames.append(df)
+
+    if not frames:
+        print("No data was extracted from the files")
+        return
+
+    long_df = pd.concat(frames, ignore_index=True)
+    if cube:
+        update_cube(cube, long_df)
+    if store:
+        update_store(store, long_df, revision)
+    if tidy:
+        before = memory_mb(long_df)
+        all_data = to_tidy(long_df)
+        print(f"Memory: {before:.2f} MB before, {memory_mb(all_data):.2f} MB after tidy conversion "
+              f"({len(all_data)} rows)")
+    else:
+        all_data = to_wide(long_df)
+
     # Save consolidated data
-    all_data.to_excel(output_file, index=False, engine='openpyxl')
+    save_output(all_data, output_file, sheets_per_file)
     print(f"Consolidation complete. Saved to: {output_file}")
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Consolidate Vahan month-wise exports")
+
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=r"C:\Users\ASUS\Downloads\OneDrive_2025-03-18\Maker (2024)",
+        help="Folder containing the downloaded Excel exports"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=r"C:\Users\ASUS\Downloads\Andhra.xlsx",
+        help="Output file; .xlsx, .csv or .parquet"
+    )
+
+    parser.add_argument(
+        "--tidy",
+        action="store_true",
+        help="Write one row per Year/Month/State/RTO/Report Type/Category instead of month columns"
+    )
+
+    parser.add_argument(
+        "--sheets-per-file",
+        type=int,
+        default=None,
+        help="For .xlsx output, start a new file after this many full sheets (default: one file)"
+    )
+
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="openpyxl",
+        help="pandas read_excel engine, e.g. openpyxl or calamine"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse files"
+    )
+
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Process every file, even identical or older copies of the same RTO export"
+    )
+
+    parser.add_argument(
+        "--cube",
+        type=str,
+        default=None,
+        help="DuckDB file of national/state/RTO rollups to update incrementally with this run"
+    )
+
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="SQLite history store to upsert this run into, keyed by RTO, report type, category, year and month"
+    )
+
+    parser.add_argument(
+        "--revision",
+        type=str,
+        default=None,
+        help="Timestamp recorded for this scrape in the history store, e.g. 2025-03-06 (default: now)"
+    )
+
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    input_path = Path(r"C:\Users\ASUS\Downloads\OneDrive_2025-03-18\Maker (2024)")
-    output_path = Path(r"C:\Users\ASUS\Downloads\Andhra.xlsx")
-    main(input_path, output_path)
+    args = parse_arguments()
+    main(Path(args.input), Path(args.output), tidy=args.tidy, sheets_per_file=args.sheets_per_file,
+         engine=args.engine, jobs=args.jobs, dedup=not args.keep_duplicates, cube=args.cube,
+         store=args.store, revision=args.revision)
@@ -0,0 +1,212 @@
+import argparse
+import duckdb
+from vahan_query import MONTHS, VahanQuery
+from report_types import drop_undated
+
+_MONTH_LIST = '[' + ', '.join(f"'{m}'" for m in MONTHS) + ']'
+
+# Rollup level -> the geography columns it keeps; every level is also keyed by
+# Report Type, Category, Year and Month
+LEVELS = {
+    'rto': ['State', 'RTO Code', 'RTO Name'],
+    'state': ['State'],
+    'national': [],
+}
+
+# Columns that identify a row at each level (RTO Name rides along with RTO Code)
+_KEYS = {
+    'rto': ['Report Type', 'RTO Code', 'Category', 'Year', 'Month'],
+    'state': ['Report Type', 'State', 'Category', 'Year', 'Month'],
+    'national': ['Report Type', 'Category', 'Year', 'Month'],
+}
+
+
+def _cols(names):
+    return ', '.join(f'"{n}"' for n in names)
+
+
+class AggregateCube:
+    """
+    Pre-computed national, state and RTO rollups by category and month, kept in a DuckDB file.
+
+    New RTO data replaces that RTO's rows for the years it covers; only the states and
+    years it touches are re-rolled, from the RTO table rather than the detail rows.
+    """
+
+    def __init__(self, db_path='vahan_cube.duckdb'):
+        self.con = duckdb.connect(str(db_path))
+        self._create_tables()
+
+    def _create_tables(self):
+        for level, geo in LEVELS.items():
+            geo_defs = ''.join(f'"{c}" VARCHAR, ' for c in geo)
+            self.con.execute(f"""
+                CREATE TABLE IF NOT EXISTS cube_{level} (
+                    "Report Type" VARCHAR, {geo_defs}"Category" VARCHAR,
+                    "Year" SMALLINT, "Month" VARCHAR, "Month No" TINYINT, "Count" BIGINT,
+                    PRIMARY KEY ({_cols(_KEYS[level])})
+                )
+            """)
+
+    def update(self, long_df):
+        """Merge long-format rows (report_types.LONG_COLUMNS) into the cube; returns RTO rows written"""
+        # Year is part of every key, so rows without one are left out (and logged)
+        long_df, _ = drop_undated(long_df, 'Aggregate cube')
+        if long_df.empty:
+            return 0
+        self.con.register('incoming', long_df)
+        try:
+            self.con.execute("BEGIN TRANSACTION")
+            self.con.execute(f"""
+                CREATE OR REPLACE TEMP TABLE batch AS
+                SELECT "Report Type", "State", "RTO Code", ANY_VALUE("RTO Name") AS "RTO Name", "Category",
+                       CAST("Year" AS SMALLINT) AS "Year", CAST("Month" AS VARCHAR) AS "Month",
+                       list_position({_MONTH_LIST}, CAST("Month" AS VARCHAR)) AS "Month No",
+                       SUM("Count") AS "Count"
+                FROM incoming
+                GROUP BY "Report Type", "State", "RTO Code", "Category", "Year", "Month"
+            """)
+
+            # A fresh download of an RTO supersedes everything held for it in that year
+            self.con.execute("""
+                DELETE FROM cube_rto WHERE ("Report Type", "RTO Code", "Year") IN
+                    (SELECT DISTINCT "Report Type", "RTO Code", "Year" FROM batch)
+            """)
+            self.con.execute(f"INSERT INTO cube_rto SELECT {_cols(self._columns('rto'))} FROM batch")
+
+            self._reroll('state', 'rto', ['Report Type', 'State', 'Year'])
+            self._reroll('national', 'state', ['Report Type', 'Year'])
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        finally:
+            self.con.unregister('incoming')
+        return self.con.execute("SELECT COUNT(*) FROM batch").fetchone()[0]
+
+    def _columns(self, level):
+        return ['Report Type'] + LEVELS[level] + ['Category', 'Year', 'Month', 'Month No', 'Count']
+
+    def _reroll(self, level, source, scope):
+        """Rebuild the rows of `level` for every scope group touched by the current batch"""
+        group = [c for c in self._columns(level) if c != 'Count']
+        scope_cols = _cols(scope)
+        self.con.execute(f"""
+            DELETE FROM cube_{level} WHERE ({scope_cols}) IN (SELECT DISTINCT {scope_cols} FROM batch)
+        """)
+        self.con.execute(f"""
+            INSERT INTO cube_{level}
+            SELECT {_cols(group)}, SUM("Count")
+            FROM cube_{source}
+            WHERE ({scope_cols}) IN (SELECT DISTINCT {scope_cols} FROM batch)
+            GROUP BY {_cols(group)}
+        """)
+
+    def _filter(self, level, report_type, year, month=None, state=None, rto_code=None):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}. Available: {', '.join(LEVELS)}")
+        clauses, params = ['"Report Type" = ?', '"Year" = ?'], [report_type, year]
+        if month:
+            clauses.append('"Month" = ?')
+            params.append(month.upper())
+        if state and level != 'national':
+            clauses.append('"State" = ?')
+            params.append(state)
+        if rto_code and level == 'rto':
+            clauses.append('"RTO Code" = ?')
+            params.append(rto_code)
+        return ' AND '.join(clauses), params
+
+    def market_share(self, level='national', year=None, month=None, state=None, rto_code=None,
+                     report_type='Maker'):
+        """Count and share of each category for one area and period (whole year when month is None)"""
+        where, params = self._filter(level, report_type, year, month, state, rto_code)
+        geo = LEVELS[level]
+        partition = f"PARTITION BY {_cols(geo)}" if geo else ''
+        return self.con.execute(f"""
+            SELECT {_cols(geo) + ', ' if geo else ''}"Category", CAST(SUM("Count") AS BIGINT) AS "Count",
+                   ROUND(100.0 * SUM("Count") / SUM(SUM("Count")) OVER ({partition}), 2) AS "Share %"
+            FROM cube_{level}
+            WHERE {where}
+            GROUP BY {_cols(geo + ['Category'])}
+            ORDER BY {_cols(geo) + ', ' if geo else ''}"Count" DESC
+        """, params).df()
+
+    def top_n(self, n=10, level='national', year=None, month=None, state=None, rto_code=None,
+              report_type='Maker'):
+        """The n biggest categories (makers by default) per area, with their market share"""
+        share = self.market_share(level, year, month, state, rto_code, report_type)
+        geo = LEVELS[level]
+        if not geo:
+            return share.head(n)
+        return share.groupby(geo, sort=False, group_keys=False).head(n)
+
+    def yoy(self, level='national', year=None, month=None, state=None, rto_code=None,
+            report_type='Maker'):
+        """Counts for `year` next to the same months of the year before, with the change"""
+        where, params = self._filter(level, report_type, year, month, state, rto_code)
+        keys = [c for c in _KEYS[level] if c != 'Year']
+        join = ' AND '.join(f'prev."{c}" = cur."{c}"' for c in keys)
+        return self.con.execute(f"""
+            SELECT cur.* EXCLUDE ("Count"), cur."Count",
+                   COALESCE(prev."Count", 0) AS "Previous Year",
+                   cur."Count" - COALESCE(prev."Count", 0) AS "Change",
+                   ROUND(100.0 * (cur."Count" - prev."Count") / NULLIF(prev."Count", 0), 2) AS "Change %"
+            FROM (SELECT * FROM cube_{level} WHERE {where}) cur
+            LEFT JOIN cube_{level} prev ON {join} AND prev."Year" = cur."Year" - 1
+            ORDER BY {_cols(LEVELS[level]) + ', ' if LEVELS[level] else ''}cur."Category", cur."Month No"
+        """, params).df()
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build and query the Vahan aggregate cube")
+
+    parser.add_argument("--db", type=str, default="vahan_cube.duckdb", help="Cube database file")
+    parser.add_argument("--update", nargs="+", default=None, help="Consolidated Parquet file(s) to merge into the cube")
+    parser.add_argument(
+        "--query",
+        choices=["top", "share", "yoy"],
+        default=None,
+        help="top: top-N categories; share: market share of every category; yoy: year-over-year change"
+    )
+    parser.add_argument("--level", choices=list(LEVELS), default="national", help="Rollup level")
+    parser.add_argument("--report-type", type=str, default="Maker", help="Report type to query")
+    parser.add_argument("--year", type=int, default=None, help="Year to query")
+    parser.add_argument("--month", type=str, default=None, help="Month to query, e.g. JAN (default: whole year)")
+    parser.add_argument("--state", type=str, default=None, help="Restrict state and RTO levels to one state")
+    parser.add_argument("--rto", type=str, default=None, help="Restrict the RTO level to one RTO code")
+    parser.add_argument("-n", type=int, default=10, help="Number of categories for --query top")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with AggregateCube(args.db) as cube:
+        if args.update:
+            with VahanQuery(args.update) as vq:
+                rows = cube.update(vq.sql('SELECT * EXCLUDE ("Month No") FROM unpivoted'))
+            print(f"Cube updated with {rows} RTO rows")
+
+        if args.query:
+            year = args.year or cube.con.execute('SELECT MAX("Year") FROM cube_national').fetchone()[0]
+            options = dict(level=args.level, year=year, month=args.month, state=args.state,
+                           rto_code=args.rto, report_type=args.report_type)
+            if args.query == 'top':
+                result = cube.top_n(args.n, **options)
+            elif args.query == 'share':
+                result = cube.market_share(**options)
+            else:
+                result = cube.yoy(**options)
+            print(result.to_string(index=False))
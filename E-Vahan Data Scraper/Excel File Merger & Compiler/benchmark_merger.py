@@ -0,0 +1,129 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import itertools
+import subprocess
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:  # peak RSS then comes from os.wait4 (POSIX only)
+    psutil = None
+
+from generate_vahan_exports import SCALES, generate
+
+MERGER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Final_Boss_Version.py')
+
+# Output extension for each sink
+SINKS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv',
+    'parquet': '.parquet',
+}
+
+
+def _run_psutil(cmd):
+    """Run cmd, sampling the RSS of it and its children; returns (seconds, peak MB, exit code)"""
+    start = time.perf_counter()
+    proc = psutil.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    peak = 0
+    while proc.poll() is None:
+        try:
+            rss = proc.memory_info().rss
+            rss += sum(c.memory_info().rss for c in proc.children(recursive=True))
+            peak = max(peak, rss)
+        except psutil.Error:
+            pass
+        time.sleep(0.05)
+    return time.perf_counter() - start, peak / (1024 * 1024), proc.returncode
+
+
+def _run_rusage(cmd):
+    """Run cmd and read the peak RSS of its largest process from wait4 (POSIX only)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Reap this child ourselves: wait4 reports its own usage, whereas
+    # getrusage(RUSAGE_CHILDREN) keeps the peak of every earlier run
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux
+    return elapsed, usage.ru_maxrss / 1024, proc.returncode
+
+
+def run_once(input_dir, output_dir, engine, sink, jobs, tidy):
+    """Time one end-to-end Final_Boss_Version run in a fresh interpreter"""
+    output_file = os.path.join(output_dir, f"merged_{engine}_{jobs}j{SINKS[sink]}")
+    cmd = [sys.executable, MERGER, '--input', input_dir, '--output', output_file,
+           '--engine', engine, '--jobs', str(jobs)]
+    if tidy:
+        cmd.append('--tidy')
+    runner = _run_psutil if psutil is not None else _run_rusage
+    elapsed, peak_mb, returncode = runner(cmd)
+    return {
+        'engine': engine,
+        'sink': sink,
+        'jobs': jobs,
+        'tidy': tidy,
+        'seconds': round(elapsed, 2),
+        'peak_rss_mb': round(peak_mb, 1),
+        'ok': returncode == 0,
+        'output_mb': round(os.path.getsize(output_file) / (1024 * 1024), 2) if os.path.exists(output_file) else None,
+    }
+
+
+def run_benchmark(input_dir, output_dir, engines, sinks, jobs_list, tidy=False, repeat=1):
+    """Run every engine x sink x jobs combination and return one result row per run"""
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    for engine, sink, jobs in itertools.product(engines, sinks, jobs_list):
+        for attempt in range(repeat):
+            result = run_once(input_dir, output_dir, engine, sink, jobs, tidy)
+            result['run'] = attempt + 1
+            results.append(result)
+            print(f"{engine:<10} {sink:<8} jobs={jobs:<3} run {attempt + 1}: "
+                  f"{result['seconds']:>8.2f}s  peak {result['peak_rss_mb']:>8.1f} MB"
+                  f"{'' if result['ok'] else '  FAILED'}")
+    return results
+
+
+def write_results(results, path):
+    """Save result rows as CSV"""
+    fields = ['engine', 'sink', 'jobs', 'tidy', 'run', 'seconds', 'peak_rss_mb', 'output_mb', 'ok']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Results saved to {path}")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark Final_Boss_Version on synthetic Vahan exports")
+
+    parser.add_argument("--workdir", type=str, default="merger_benchmark", help="Folder for data and outputs")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Synthetic data scale")
+    parser.add_argument("--input", type=str, default=None, help="Use an existing export folder instead of generating one")
+    parser.add_argument("--engines", nargs="+", default=["openpyxl"], help="read_excel engines, e.g. openpyxl calamine")
+    parser.add_argument("--sinks", nargs="+", choices=sorted(SINKS), default=["xlsx", "parquet"], help="Output formats")
+    parser.add_argument("--jobs", nargs="+", type=int, default=[1, os.cpu_count()], help="Worker process counts")
+    parser.add_argument("--tidy", action="store_true", help="Benchmark the tidy output mode")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per combination")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    input_dir = args.input
+    if input_dir is None:
+        input_dir = os.path.join(args.workdir, f"exports_{args.scale}")
+        if not os.path.isdir(input_dir):
+            generate(input_dir, SCALES[args.scale], report_types=('Maker', 'Vehicle Class'), jobs=os.cpu_count())
+
+    results = run_benchmark(input_dir, os.path.join(args.workdir, 'outputs'), args.engines, args.sinks,
+                            sorted(set(args.jobs)), args.tidy, args.repeat)
+    write_results(results, os.path.join(args.workdir, f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"))
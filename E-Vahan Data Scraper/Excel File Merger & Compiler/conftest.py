@@ -0,0 +1,22 @@
+import random
+import pytest
+from openpyxl import load_workbook
+from generate_vahan_exports import write_export
+
+
+@pytest.fixture
+def make_export(tmp_path):
+    """Write one synthetic export to tmp_path/<state>/RTO 1 - <rto_code>.xlsx and return its path"""
+    def make(rto_code, state='Assam', year=2024, report_type='Maker', months=('JAN', 'FEB'),
+             categories=('HONDA', 'TATA'), seed=0, name=None, title=None):
+        path = tmp_path / state / (name or f"RTO 1 - {rto_code}.xlsx")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_export(str(path), report_type, 'RTO 1', rto_code, state, year, list(months),
+                     list(categories), random.Random(seed))
+        if title is not None:
+            # e.g. a title without the year, which sends the merger to its file-name fallback
+            wb = load_workbook(path)
+            wb.active['A1'] = title
+            wb.save(path)
+        return str(path)
+    return make
@@ -0,0 +1,101 @@
+import os
+import sys
+import csv
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from report_types import parse_title
+
+# Shared zip-level A1 reader lives with the other scraper utilities
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utilities'))
+import title_reader
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """BLAKE2b digest of the file contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_title(path):
+    """Read cell A1 straight from the zip; empty string if the file cannot be opened"""
+    try:
+        return title_reader.read_title(path).strip()
+    except Exception:
+        return ''
+
+
+def fingerprint(path):
+    """Everything the pre-pass needs about one file: identity, content hash and (RTO Code, title) key"""
+    stat = os.stat(path)
+    title = read_title(path)
+    try:
+        rto_code = parse_title(title, path)['RTO Code']
+    except ValueError:
+        rto_code = None
+    return {
+        'file': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        # Unreadable files are never collapsed, so they are not hashed
+        'digest': file_digest(path) if title else None,
+        'key': (rto_code, title) if title else None,
+    }
+
+
+def deduplicate(paths, jobs=1):
+    """
+    Keep only the newest copy of each export.
+
+    Files are first collapsed by identical contents, then by (RTO Code, title) so that
+    re-downloads of the same RTO with revised counts also collapse to the latest one.
+    Files whose title cannot be read (empty or broken downloads) are always kept, even when
+    their contents match another such file, and left for the merger to report.
+
+    Returns:
+        (files to process, list of duplicate records)
+    """
+    paths = [p for p in paths if not os.path.basename(p).startswith('~$')]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            prints = list(executor.map(fingerprint, paths, chunksize=32))
+    else:
+        prints = [fingerprint(p) for p in paths]
+
+    # Newest first, so the first file seen for a digest or key is the one kept
+    prints.sort(key=lambda p: p['mtime'], reverse=True)
+
+    kept, duplicates = [], []
+    # digest / key -> the file that survived for it, so reports always name the copy actually kept
+    by_digest, by_key = {}, {}
+    for info in prints:
+        if info['key'] is None:
+            kept.append(info['file'])
+            continue
+
+        survivor = by_digest.get(info['digest'])
+        if survivor is not None:
+            duplicates.append({'file': info['file'], 'kept': survivor, 'reason': 'identical content'})
+            continue
+
+        survivor = by_key.get(info['key'])
+        if survivor is not None:
+            duplicates.append({'file': info['file'], 'kept': survivor,
+                               'reason': f"older copy of {info['key'][0] or info['key'][1]}"})
+        else:
+            survivor = info['file']
+            kept.append(survivor)
+            by_key[info['key']] = survivor
+        by_digest[info['digest']] = survivor
+
+    return sorted(kept), duplicates
+
+
+def write_duplicate_report(duplicates, path):
+    """Save the duplicate list as CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['file', 'kept', 'reason'])
+        writer.writeheader()
+        writer.writerows(duplicates)
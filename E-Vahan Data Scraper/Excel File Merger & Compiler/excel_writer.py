@@ -0,0 +1,154 @@
+from pathlib import Path
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:  # openpyxl write-only mode is the fallback
+    xlsxwriter = None
+
+# Hard row limit of an .xlsx worksheet, header row included
+EXCEL_MAX_ROWS = 1_048_576
+
+# Rows converted to plain Python values at a time while streaming
+CHUNK_ROWS = 50_000
+
+
+def _column_formats(df):
+    """Pick one number format per column from its dtype"""
+    formats = []
+    for dtype in df.dtypes:
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            formats.append('0')
+        elif pd.api.types.is_float_dtype(dtype):
+            formats.append('0.00')
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            formats.append('yyyy-mm-dd')
+        else:
+            formats.append(None)
+    return formats
+
+
+def _iter_rows(frames):
+    """Yield plain row tuples, with NaN/NA turned into empty cells"""
+    for frame in frames:
+        for start in range(0, len(frame), CHUNK_ROWS):
+            chunk = frame.iloc[start:start + CHUNK_ROWS].astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            yield from chunk.itertuples(index=False, name=None)
+
+
+def _part_path(output_file, part):
+    """Output path for the n-th file of a split export: report.xlsx, report_part2.xlsx, ..."""
+    path = Path(output_file)
+    if part == 1:
+        return path
+    return path.with_name(f"{path.stem}_part{part}{path.suffix}")
+
+
+class _XlsxWriterBook:
+    """Constant-memory workbook: rows are flushed to disk as soon as the next row starts"""
+
+    def __init__(self, path, formats):
+        self.book = xlsxwriter.Workbook(str(path), {'constant_memory': True})
+        # Format objects are created once per column and shared by every sheet
+        self.formats = [self.book.add_format({'num_format': f}) if f else None for f in formats]
+        self.sheet = None
+
+    def add_sheet(self, name, header, widths):
+        self.sheet = self.book.add_worksheet(name)
+        for col, (width, fmt) in enumerate(zip(widths, self.formats)):
+            self.sheet.set_column(col, col, width, fmt)
+        self.sheet.write_row(0, 0, header)
+
+    def write_row(self, row_idx, row):
+        self.sheet.write_row(row_idx, 0, row)
+
+    def close(self):
+        self.book.close()
+
+
+class _OpenpyxlWriteOnlyBook:
+    """openpyxl write-only workbook; rows are serialised as they are appended
+
+    Write-only sheets cannot carry column-level number formats, so values keep the
+    General format here; install xlsxwriter to get them.
+    """
+
+    def __init__(self, path, formats):
+        from openpyxl import Workbook
+        self.path = path
+        self.book = Workbook(write_only=True)
+        self.sheet = None
+
+    def add_sheet(self, name, header, widths):
+        from openpyxl.utils import get_column_letter
+        self.sheet = self.book.create_sheet(name)
+        for col, width in enumerate(widths, 1):
+            self.sheet.column_dimensions[get_column_letter(col)].width = width
+        self.sheet.append(list(header))
+
+    def write_row(self, row_idx, row):
+        self.sheet.append(row)
+
+    def close(self):
+        self.book.save(self.path)
+
+
+def write_excel_streaming(data, output_file, sheet_name='Data', max_rows=EXCEL_MAX_ROWS,
+                          sheets_per_file=None):
+    """
+    Stream a DataFrame (or an iterable of same-columned DataFrames) into .xlsx without
+    holding cell objects in memory.
+
+    A new sheet is started whenever max_rows is reached; with sheets_per_file set, a new
+    file (name_part2.xlsx, ...) is started after that many sheets.
+
+    Returns:
+        list of (file path, sheet name, data rows) for every sheet written
+    """
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("No data to write")
+
+    header = [str(c) for c in first.columns]
+    formats = _column_formats(first)
+    sample = first.head(1000).astype(str)
+    widths = [min(max(len(h), int(sample[c].str.len().max() if len(sample) else 0)) + 2, 50)
+              for h, c in zip(header, first.columns)]
+    rows_per_sheet = max_rows - 1
+    book_class = _XlsxWriterBook if xlsxwriter is not None else _OpenpyxlWriteOnlyBook
+
+    def all_frames():
+        yield first
+        yield from frames
+
+    written = []
+    book = None
+    part = 0
+    sheet_no = 0
+    row_idx = rows_per_sheet  # forces a new sheet before the first row
+
+    try:
+        for row in _iter_rows(all_frames()):
+            if row_idx >= rows_per_sheet:
+                if book is None or (sheets_per_file and sheet_no >= sheets_per_file):
+                    if book is not None:
+                        book.close()
+                    part += 1
+                    sheet_no = 0
+                    book = book_class(_part_path(output_file, part), formats)
+                sheet_no += 1
+                name = sheet_name if sheet_no == 1 else f"{sheet_name}_{sheet_no}"
+                book.add_sheet(name, header, widths)
+                written.append([str(_part_path(output_file, part)), name, 0])
+                row_idx = 0
+            row_idx += 1
+            book.write_row(row_idx, row)
+            written[-1][2] += 1
+    finally:
+        if book is not None:
+            book.close()
+
+    return [tuple(w) for w in written]
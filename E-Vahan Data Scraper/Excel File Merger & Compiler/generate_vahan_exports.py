@@ -0,0 +1,161 @@
+import os
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font
+
+# Named scales for the benchmark: a single state, one national run, a multi-year backlog
+SCALES = {
+    'small': 100,
+    'medium': 1570,
+    'large': 20000,
+}
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+# State name -> RTO code prefix, following the scraper's state list
+STATES = {
+    'Andhra Pradesh': 'AP', 'Arunachal Pradesh': 'AR', 'Assam': 'AS', 'Bihar': 'BR',
+    'Chhattisgarh': 'CG', 'Delhi': 'DL', 'Goa': 'GA', 'Gujarat': 'GJ',
+    'Himachal Pradesh': 'HP', 'Haryana': 'HR', 'Jharkhand': 'JH', 'Karnataka': 'KA',
+    'Kerala': 'KL', 'Maharashtra': 'MH', 'Madhya Pradesh': 'MP', 'Odisha': 'OD',
+    'Punjab': 'PB', 'Rajasthan': 'RJ', 'Tamil Nadu': 'TN', 'Uttar Pradesh': 'UP',
+    'Uttarakhand': 'UK', 'West Bengal': 'WB',
+}
+
+CATEGORIES = {
+    'Maker': [
+        'HONDA MOTORCYCLE AND SCOOTER INDIA (P) LTD', 'HERO MOTOCORP LTD', 'BAJAJ AUTO LTD',
+        'TVS MOTOR COMPANY LTD', 'MARUTI SUZUKI INDIA LTD', 'HYUNDAI MOTOR INDIA LTD',
+        'TATA MOTORS LTD', 'MAHINDRA & MAHINDRA LIMITED', 'ROYAL-ENFIELD (UNIT OF EICHER LTD)',
+        'AJAX ENGINEERING PVT LTD', 'ASHOK LEYLAND LTD', 'KIA INDIA PRIVATE LIMITED',
+        'TOYOTA KIRLOSKAR MOTOR PVT LTD', 'ATHER ENERGY PVT LTD', 'OLA ELECTRIC TECHNOLOGIES PVT LTD',
+    ],
+    'Vehicle Class': [
+        'M-CYCLE/SCOOTER', 'MOTOR CAR', 'GOODS CARRIER', 'E-RICKSHAW(P)', 'THREE WHEELER (PASSENGER)',
+        'AGRICULTURAL TRACTOR', 'BUS', 'MOPED', 'OMNI BUS', 'CONSTRUCTION EQUIPMENT VEHICLE',
+    ],
+}
+
+# Kinds of broken download seen in the wild
+MALFORMED_KINDS = ('truncated', 'empty', 'no_month_row', 'bad_title')
+
+
+def write_export(path, report_type, rto_name, rto_code, state, year, months, categories, rng):
+    """Write one export laid out like the Vahan dashboard's Excel download"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'reportTable'
+    width = len(months) + 3
+
+    ws.append([f"{report_type} Month Wise Data of {rto_name} - {rto_code} , {state} ({year})"])
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=width)
+    ws.append(['S No', report_type, 'Month Wise'] + [None] * (len(months) - 1) + ['TOTAL'])
+    if len(months) > 1:
+        ws.merge_cells(start_row=2, start_column=3, end_row=2, end_column=2 + len(months))
+    ws.append([None, None] + months + [None])
+    for cell in ws[1] + ws[2] + ws[3]:
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+
+    for serial, category in enumerate(categories, 1):
+        counts = [int(rng.paretovariate(1.2) * 3) for _ in months]
+        ws.append([serial, category] + counts + [sum(counts)])
+
+    wb.save(path)
+
+
+def write_malformed(path, kind, report_type, rto_name, rto_code, state, year, months, categories, rng):
+    """Write one of the broken files the merger has to survive"""
+    if kind == 'empty':
+        open(path, 'wb').close()
+        return
+    if kind == 'bad_title':
+        rto_name, rto_code, state = '', '', ''
+    write_export(path, report_type, rto_name, rto_code, state, year,
+                 [] if kind == 'no_month_row' else months, categories, rng)
+    if kind == 'truncated':
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) // 2)
+
+
+def plan_files(count, report_types, year, month_count, malformed_rate, seed):
+    """Deterministic list of (path parts, export arguments) for a run of `count` files"""
+    rng = random.Random(seed)
+    states = list(STATES.items())
+    months = MONTHS[:month_count]
+    plan = []
+    for i in range(count):
+        state, prefix = states[i % len(states)]
+        rto_number = i // len(states) + 1
+        report_type = report_types[i % len(report_types)]
+        pool = CATEGORIES.get(report_type, CATEGORIES['Vehicle Class'])
+        categories = rng.sample(pool, rng.randint(max(1, len(pool) // 3), len(pool)))
+        kind = rng.choice(MALFORMED_KINDS) if rng.random() < malformed_rate else None
+        plan.append({
+            'folder': os.path.join(report_type, state),
+            'file': f"RTO {rto_number} - {prefix}{rto_number}.xlsx",
+            'kind': kind,
+            'args': (report_type, f"RTO {rto_number}", f"{prefix}{rto_number}", state, year,
+                     months, categories, rng.random()),
+        })
+    return plan
+
+
+def _write_planned(item, output_dir):
+    folder = os.path.join(output_dir, item['folder'])
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, item['file'])
+    *args, seed = item['args']
+    rng = random.Random(seed)
+    if item['kind']:
+        write_malformed(path, item['kind'], *args, rng)
+    else:
+        write_export(path, *args, rng)
+    return item['kind']
+
+
+def generate(output_dir, count, report_types=('Maker',), year=2025, month_count=12,
+             malformed_rate=0.01, seed=42, jobs=1):
+    """Generate `count` synthetic exports under output_dir/<Report Type>/<State>/"""
+    plan = plan_files(count, list(report_types), year, month_count, malformed_rate, seed)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        kinds = list(executor.map(_write_planned, plan, [output_dir] * len(plan), chunksize=32))
+    malformed = sum(1 for k in kinds if k)
+    print(f"Generated {count} files in {output_dir} ({malformed} malformed)")
+    return plan
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate synthetic Vahan month-wise exports")
+
+    parser.add_argument("output_dir", type=str, help="Folder to write the exports into")
+    parser.add_argument(
+        "--scale",
+        choices=sorted(SCALES),
+        default="small",
+        help="Named file count: small=100, medium=1570, large=20000"
+    )
+    parser.add_argument("--files", type=int, default=None, help="Explicit file count (overrides --scale)")
+    parser.add_argument(
+        "--report-types",
+        nargs="+",
+        default=["Maker"],
+        help="Y-axis report types to mix, e.g. Maker 'Vehicle Class'"
+    )
+    parser.add_argument("--year", type=int, default=2025, help="Year written into the titles")
+    parser.add_argument("--months", type=int, default=12, help="Number of month columns (1-12)")
+    parser.add_argument("--malformed-rate", type=float, default=0.01, help="Fraction of broken files")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    generate(args.output_dir, args.files or SCALES[args.scale], args.report_types, args.year,
+             args.months, args.malformed_rate, args.seed, args.jobs)
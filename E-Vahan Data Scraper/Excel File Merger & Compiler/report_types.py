@@ -0,0 +1,126 @@
+import os
+import re
+import logging
+import pandas as pd
+
+# Common long-format schema emitted for every report type
+LONG_COLUMNS = ['Year', 'Month', 'State', 'RTO Code', 'RTO Name', 'Report Type', 'Category', 'Count']
+
+# Report type name -> column mapper, filled by @register
+_MAPPERS = {}
+
+# Single alternation over every registered type, rebuilt by @register
+_TITLE_PATTERN = None
+
+# Fallback for files whose title is missing or mangled, e.g. "BARPETA - AS15.xlsx"
+_FILENAME_PATTERN = re.compile(r'([A-Za-z\s]+?)\s*-\s*([A-Z0-9]+)')
+
+
+def _build_title_pattern(report_types):
+    # Longest names first so "Vehicle Category Group" wins over "Vehicle Category"
+    alternation = '|'.join(re.escape(t) for t in sorted(report_types, key=len, reverse=True))
+    return re.compile(
+        rf'(?P<type>{alternation})\s+Month\s+Wise\s+Data\s+of\s+'
+        r'(?P<name>.+?)\s+-\s+(?P<code>[A-Z0-9]+)\s*[,\s]\s*(?P<state>.+?)\s*\((?P<year>\d{4})\)'
+    )
+
+
+def register(*report_types):
+    """Register a column mapper for one or more report types (Y-axis values on the Vahan dashboard)"""
+    def decorator(mapper):
+        global _TITLE_PATTERN
+        for report_type in report_types:
+            _MAPPERS[report_type] = mapper
+        _TITLE_PATTERN = _build_title_pattern(_MAPPERS)
+        return mapper
+    return decorator
+
+
+def report_types():
+    """Names of all registered report types"""
+    return list(_MAPPERS)
+
+
+def parse_title(title, file_path=None):
+    """Extract Report Type, RTO Name, RTO Code, State and Year from the title string
+
+    When the title does not match and a file path is given, the RTO is taken from the
+    file name and the State from its folder, as the Compiler notebooks did.
+    """
+    match = _TITLE_PATTERN.search(title or '')
+    if match:
+        return {
+            'Report Type': match.group('type'),
+            'RTO Name': match.group('name').strip(),
+            'RTO Code': match.group('code').strip(),
+            'State': match.group('state').strip(),
+            'Year': int(match.group('year')),
+        }
+
+    if file_path:
+        report_type = next((t for t in _MAPPERS if (title or '').startswith(t)), None)
+        file_match = _FILENAME_PATTERN.search(os.path.basename(file_path))
+        if report_type and file_match:
+            year = re.search(r'\((\d{4})\)', title)
+            return {
+                'Report Type': report_type,
+                'RTO Name': file_match.group(1).strip(),
+                'RTO Code': file_match.group(2).strip(),
+                'State': os.path.basename(os.path.dirname(file_path)),
+                'Year': int(year.group(1)) if year else None,
+            }
+
+    raise ValueError(f"Title format not recognized: {title}")
+
+
+def drop_undated(long_df, target):
+    """
+    Drop the rows whose Year is unknown (the title had no year and the file-name fallback
+    was used). Stores keyed by year cannot hold them, so they are counted and logged instead.
+
+    Returns:
+        (rows with a Year, number of rows dropped)
+    """
+    undated = long_df['Year'].isna()
+    skipped = int(undated.sum())
+    if skipped:
+        codes = sorted(long_df.loc[undated, 'RTO Code'].astype(str).unique())
+        more = f" and {len(codes) - 10} more" if len(codes) > 10 else ''
+        logging.warning(f"{target}: skipped {skipped} rows without a Year from RTO {', '.join(codes[:10])}{more}")
+    return long_df[~undated], skipped
+
+
+def _label_block(df, layout):
+    """Cut the label and month columns of the data block out of the raw grid"""
+    block = df.iloc[layout['data_start']:, [layout['label_col']] + layout['month_cols']]
+    block.columns = ['Category'] + layout['months']
+    block = block.dropna(subset=['Category'])
+    block = block.assign(Category=block['Category'].astype(str).str.strip())
+    return block[block['Category'] != '']
+
+
+@register('Maker', 'Maker Model')
+def map_maker(df, layout):
+    """Maker rows are used as-is, minus any trailing grand total"""
+    block = _label_block(df, layout)
+    return block[block['Category'].str.upper() != 'TOTAL']
+
+
+@register('Vehicle Class', 'Vehicle Category', 'Vehicle Category Group', 'Fuel', 'Norms')
+def map_classification(df, layout):
+    """Classification reports interleave serial numbers and TOTAL rows that are not categories"""
+    block = _label_block(df, layout)
+    label = block['Category']
+    return block[~(label.str.fullmatch(r'\d+') | (label.str.upper() == 'TOTAL'))]
+
+
+def to_long(df, layout, title_info):
+    """Dispatch a raw grid to its report type's mapper and return rows in the LONG_COLUMNS schema"""
+    mapper = _MAPPERS[title_info['Report Type']]
+    block = mapper(df, layout)
+
+    long_df = block.melt(id_vars='Category', var_name='Month', value_name='Count')
+    long_df['Count'] = pd.to_numeric(long_df['Count'], errors='coerce').fillna(0).astype(int)
+    for col in ['Year', 'State', 'RTO Code', 'RTO Name', 'Report Type']:
+        long_df[col] = title_info[col]
+    return long_df[LONG_COLUMNS]
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from aggregate_cube import AggregateCube
+from Final_Boss_Version import process_excel_file
+
+
+def test_update_rolls_rtos_up_to_national_shares(make_export, tmp_path):
+    as1 = process_excel_file(make_export('AS1'))
+    as2 = process_excel_file(make_export('AS2', name='RTO 2 - AS2.xlsx', seed=1))
+    both = pd.concat([as1, as2], ignore_index=True)
+
+    with AggregateCube(tmp_path / 'cube.duckdb') as cube:
+        assert cube.update(both) == len(both)
+        share = cube.market_share(year=2024)
+
+    expected = both.groupby('Category')['Count'].sum().to_dict()
+    assert dict(zip(share['Category'], share['Count'])) == expected
+    assert share['Share %'].sum() == pytest.approx(100, abs=0.1)
+
+
+def test_new_download_replaces_the_rto(make_export, tmp_path):
+    first = process_excel_file(make_export('AS1'))
+    revised = process_excel_file(make_export('AS1', seed=5))
+
+    with AggregateCube(tmp_path / 'cube.duckdb') as cube:
+        cube.update(first)
+        cube.update(revised)
+        national = cube.con.execute('SELECT SUM("Count") FROM cube_national').fetchone()[0]
+
+    assert national == revised['Count'].sum()
+
+
+def test_update_skips_rows_from_a_title_without_a_year(make_export, tmp_path, caplog):
+    dated = process_excel_file(make_export('AS1'))
+    undated = process_excel_file(make_export('AS2', name='RTO 2 - AS2.xlsx', title='Maker Month Wise Data'))
+    assert undated['Year'].isna().all() and len(undated)
+
+    with AggregateCube(tmp_path / 'cube.duckdb') as cube:
+        rows = cube.update(pd.concat([dated, undated], ignore_index=True))
+        codes = cube.con.execute('SELECT DISTINCT "RTO Code" FROM cube_rto').fetchall()
+        national = cube.con.execute('SELECT SUM("Count") FROM cube_national').fetchone()[0]
+
+    assert rows == len(dated)
+    assert codes == [('AS1',)]
+    assert national == dated['Count'].sum()
+    assert f"skipped {len(undated)} rows without a Year from RTO AS2" in caplog.text
+
+
+def test_update_with_only_undated_rows_writes_nothing(make_export, tmp_path):
+    undated = process_excel_file(make_export('AS2', title='Maker Month Wise Data'))
+
+    with AggregateCube(tmp_path / 'cube.duckdb') as cube:
+        assert cube.update(undated) == 0
+        assert cube.con.execute('SELECT COUNT(*) FROM cube_rto').fetchone()[0] == 0
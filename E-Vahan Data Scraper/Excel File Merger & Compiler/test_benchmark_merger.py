@@ -0,0 +1,36 @@
+import sys
+import pandas as pd
+import Final_Boss_Version
+from benchmark_merger import _run_rusage
+from generate_vahan_exports import generate
+
+
+def test_generated_exports_merge_cleanly(tmp_path):
+    plan = generate(str(tmp_path / 'exports'), 12, report_types=('Maker', 'Vehicle Class'),
+                    month_count=3, malformed_rate=0)
+    output = tmp_path / 'merged.xlsx'
+
+    Final_Boss_Version.main(str(tmp_path / 'exports'), str(output))
+
+    merged = pd.read_excel(output)
+    assert set(merged['RTO Code']) == {item['args'][2] for item in plan}
+    assert list(merged.columns[-4:]) == ['JAN', 'FEB', 'MAR', 'TOTAL']
+
+
+def test_merger_survives_malformed_exports(tmp_path):
+    generate(str(tmp_path / 'exports'), 8, malformed_rate=1.0)
+
+    Final_Boss_Version.main(str(tmp_path / 'exports'), str(tmp_path / 'merged.xlsx'))
+
+
+def test_run_rusage_reports_exit_code_and_peak():
+    seconds, peak_mb, returncode = _run_rusage([sys.executable, '-c', 'import sys; sys.exit(3)'])
+    assert returncode == 3
+    assert seconds > 0 and peak_mb > 0
+
+
+def test_run_rusage_measures_each_run_on_its_own():
+    _, big_mb, _ = _run_rusage([sys.executable, '-c', 'x = bytearray(400 * 1024 * 1024)'])
+    _, small_mb, _ = _run_rusage([sys.executable, '-c', 'pass'])
+    # Each child also counts what it inherited from this process before exec, so compare the two
+    assert big_mb - small_mb > 200
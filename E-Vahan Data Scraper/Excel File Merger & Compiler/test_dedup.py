@@ -0,0 +1,41 @@
+import os
+import shutil
+from dedup import deduplicate
+
+
+def test_identical_and_older_copies_collapse(make_export):
+    original = make_export('AS1')
+    copy = original.replace('AS1.xlsx', 'AS1 (1).xlsx')
+    shutil.copyfile(original, copy)
+    revised = make_export('AS1', seed=1, name='RTO 1 - AS1 (2).xlsx')
+    os.utime(original, (1, 1))
+    os.utime(copy, (2, 2))
+
+    kept, duplicates = deduplicate([original, copy, revised])
+
+    assert kept == [revised]
+    reasons = {d['file']: d['reason'] for d in duplicates}
+    assert reasons[copy] == 'older copy of AS1'
+    assert reasons[original] == 'identical content'
+
+
+def test_different_rtos_are_all_kept(make_export):
+    paths = [make_export('AS1'), make_export('AS2', name='RTO 2 - AS2.xlsx', seed=1)]
+
+    kept, duplicates = deduplicate(paths)
+
+    assert kept == sorted(paths)
+    assert duplicates == []
+
+
+def test_empty_files_are_not_content_duplicates(tmp_path):
+    empty_ap = tmp_path / 'Andhra Pradesh' / 'RTO 1 - AP1.xlsx'
+    empty_uk = tmp_path / 'Uttarakhand' / 'RTO 2 - UK2.xlsx'
+    for path in (empty_ap, empty_uk):
+        path.parent.mkdir()
+        path.write_bytes(b'')
+
+    kept, duplicates = deduplicate([str(empty_ap), str(empty_uk)])
+
+    assert kept == sorted([str(empty_ap), str(empty_uk)])
+    assert duplicates == []
@@ -0,0 +1,49 @@
+import pandas as pd
+from report_types import LONG_COLUMNS
+from timeseries_store import TimeSeriesStore
+
+
+def _rows(*counts, year=2024, rto_code='AS1'):
+    """One JAN row per category, with the given counts"""
+    return pd.DataFrame([[year, 'JAN', 'Assam', rto_code, 'RTO 1', 'Maker', category, count]
+                         for category, count in zip(('HONDA', 'TATA'), counts)], columns=LONG_COLUMNS)
+
+
+def _counts(df):
+    return dict(zip(df['Category'], df['Count']))
+
+
+def test_upsert_writes_only_changes_and_as_of_rebuilds_the_past(tmp_path):
+    with TimeSeriesStore(tmp_path / 'history.sqlite') as store:
+        assert store.upsert(_rows(5, 7), '2024-03-01') == (2, 0)
+        assert store.upsert(_rows(5, 9), '2024-04-01') == (1, 1)
+
+        assert _counts(store.latest()) == {'HONDA': 5, 'TATA': 9}
+        assert _counts(store.as_of('2024-03-15')) == {'HONDA': 5, 'TATA': 7}
+        assert store.as_of('2024-02-01').empty
+        assert list(store.history('AS1', category='TATA')['Count']) == [7, 9]
+
+
+def test_upsert_counts_and_logs_rows_without_a_year(tmp_path, caplog):
+    rows = pd.concat([_rows(5), _rows(7, 3, year=None, rto_code='AS2')], ignore_index=True)
+
+    with TimeSeriesStore(tmp_path / 'history.sqlite') as store:
+        assert store.upsert(rows, '2024-03-01') == (1, 0)
+        latest = store.latest()
+
+    assert list(latest['RTO Code']) == ['AS1']
+    assert "History store: skipped 2 rows without a Year from RTO AS2" in caplog.text
+
+
+def test_older_snapshot_imported_later_fills_history_but_not_latest(tmp_path):
+    with TimeSeriesStore(tmp_path / 'history.sqlite') as store:
+        store.upsert(_rows(5, 9), '2024-04-01')
+        assert store.upsert(_rows(5, 7), '2024-03-01') == (2, 0)
+
+        assert _counts(store.latest()) == {'HONDA': 5, 'TATA': 9}
+        assert _counts(store.as_of('2024-03-15')) == {'HONDA': 5, 'TATA': 7}
+        assert _counts(store.as_of('2024-04-15')) == {'HONDA': 5, 'TATA': 9}
+
+        # Matches the March value in effect on that date, so nothing new to write
+        assert store.upsert(_rows(5, 7), '2024-03-20') == (0, 2)
+        assert _counts(store.latest()) == {'HONDA': 5, 'TATA': 9}
@@ -0,0 +1,233 @@
+import sqlite3
+import argparse
+from datetime import datetime
+import pandas as pd
+from report_types import drop_undated
+
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+# Store column -> long-format column
+COLUMNS = {
+    'rto_code': 'RTO Code',
+    'report_type': 'Report Type',
+    'category': 'Category',
+    'year': 'Year',
+    'month': 'Month',
+    'state': 'State',
+    'rto_name': 'RTO Name',
+    'count': 'Count',
+}
+
+# Identity of one observation; a new scrape of the same key is a revision of it
+KEY = ['rto_code', 'report_type', 'category', 'year', 'month']
+
+_KEY_SQL = ', '.join(KEY)
+_JOIN_SQL = ' AND '.join(f"l.{k} = batch.{k}" for k in KEY)
+_REVISION_JOIN_SQL = ' AND '.join(f"r.{k} = batch.{k}" for k in KEY)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS latest (
+    rto_code TEXT NOT NULL, report_type TEXT NOT NULL, category TEXT NOT NULL,
+    year INTEGER NOT NULL, month TEXT NOT NULL, month_no INTEGER,
+    state TEXT, rto_name TEXT, count INTEGER NOT NULL, revision TEXT NOT NULL,
+    PRIMARY KEY ({_KEY_SQL})
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS revisions (
+    rto_code TEXT NOT NULL, report_type TEXT NOT NULL, category TEXT NOT NULL,
+    year INTEGER NOT NULL, month TEXT NOT NULL, month_no INTEGER,
+    state TEXT, rto_name TEXT, count INTEGER NOT NULL, revision TEXT NOT NULL,
+    PRIMARY KEY ({_KEY_SQL}, revision)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS latest_by_state ON latest (report_type, state, year, month_no);
+"""
+
+
+def wide_to_long(df):
+    """Turn a wide consolidated frame (one column per month) back into long rows"""
+    if 'Month' in df.columns:
+        return df
+    months = [m for m in MONTHS if m in df.columns]
+    id_vars = [c for c in df.columns if c not in months and c != 'TOTAL']
+    return df.melt(id_vars=id_vars, value_vars=months, var_name='Month', value_name='Count')
+
+
+class TimeSeriesStore:
+    """
+    Multi-year history of Vahan counts in SQLite, one row per
+    (RTO Code, Report Type, Category, Year, Month).
+
+    `latest` holds the current value of every key; `revisions` keeps every value a key
+    has ever had with the timestamp of the scrape that brought it, so past states of
+    the data can be rebuilt without the old snapshot folders.
+    """
+
+    def __init__(self, db_path='vahan_history.sqlite'):
+        self.con = sqlite3.connect(str(db_path))
+        self.con.executescript(SCHEMA)
+
+    def upsert(self, long_df, revision=None):
+        """
+        Merge a scrape into the store. Only keys that are new or whose count differs from
+        the value in effect at `revision` are written, so the cost follows the number of
+        changed rows, not the history size. Scrapes may be imported out of order; `latest`
+        only moves forward.
+
+        Returns:
+            (rows written, rows unchanged)
+        """
+        revision = revision or datetime.now().isoformat(timespec='seconds')
+        # Year is part of the key, so rows without one are left out (and logged)
+        rows, _ = drop_undated(wide_to_long(long_df), 'History store')
+        rows = rows.rename(columns={v: k for k, v in COLUMNS.items()})
+        rows = rows.groupby(KEY, as_index=False, observed=True).agg(
+            state=('state', 'first'), rto_name=('rto_name', 'first'), count=('count', 'sum'))
+        rows['month'] = rows['month'].astype(str)
+        rows['month_no'] = rows['month'].map({m: i for i, m in enumerate(MONTHS, 1)})
+        rows['year'] = rows['year'].astype(int)
+        rows['count'] = rows['count'].astype(int)
+        rows['revision'] = revision
+        columns = KEY + ['month_no', 'state', 'rto_name', 'count', 'revision']
+
+        with self.con:
+            self.con.execute("CREATE TEMP TABLE IF NOT EXISTS batch AS SELECT * FROM latest WHERE 0")
+            self.con.execute("DELETE FROM batch")
+            self.con.executemany(
+                f"INSERT INTO batch ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows[columns].itertuples(index=False, name=None)
+            )
+            # Keep only what is new or different from the value in effect at this revision,
+            # so snapshots can be imported in any order
+            self.con.execute(f"""
+                DELETE FROM batch WHERE (
+                    SELECT r.count FROM revisions r WHERE {_REVISION_JOIN_SQL}
+                    AND r.revision <= batch.revision
+                    ORDER BY r.revision DESC LIMIT 1
+                ) = batch.count
+            """)
+            changed = self.con.execute("SELECT COUNT(*) FROM batch").fetchone()[0]
+            self.con.execute("INSERT OR REPLACE INTO revisions SELECT * FROM batch")
+            # An older snapshot must not overwrite a newer current value
+            self.con.execute(f"""
+                INSERT OR REPLACE INTO latest SELECT * FROM batch WHERE NOT EXISTS (
+                    SELECT 1 FROM latest l WHERE {_JOIN_SQL}
+                    AND l.revision > batch.revision
+                )
+            """)
+        return changed, len(rows) - changed
+
+    def _select(self, source, where, params):
+        query = f"""
+            SELECT state, rto_code, rto_name, report_type, category, year, month, count, revision
+            FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY report_type, state, rto_code, category, year, month_no, revision
+        """
+        df = pd.read_sql_query(query, self.con, params=params)
+        return df.rename(columns=COLUMNS | {'revision': 'Revision'})
+
+    def _where(self, rto_code=None, report_type=None, year=None, state=None):
+        where, params = [], []
+        for column, value in (('rto_code', rto_code), ('report_type', report_type),
+                              ('year', year), ('state', state)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        return where, params
+
+    def latest(self, rto_code=None, report_type=None, year=None, state=None):
+        """Current value of every matching key"""
+        where, params = self._where(rto_code, report_type, year, state)
+        return self._select('latest', where, params)
+
+    def as_of(self, when, rto_code=None, report_type=None, year=None, state=None):
+        """The data as it stood at `when` (ISO date or timestamp): latest revision at or before it"""
+        where, params = self._where(rto_code, report_type, year, state)
+        when = when if isinstance(when, str) else when.isoformat(timespec='seconds')
+        # A bare date covers the whole day
+        if len(when) == 10:
+            when += 'T23:59:59'
+        source = f"""(
+            SELECT * FROM revisions r
+            WHERE r.revision = (
+                SELECT MAX(revision) FROM revisions
+                WHERE {' AND '.join(f'{k} = r.{k}' for k in KEY)} AND revision <= ?
+            )
+        )"""
+        return self._select(source, where, [when] + params)
+
+    def history(self, rto_code, report_type=None, category=None, year=None):
+        """Every revision recorded for one RTO, oldest first"""
+        where, params = self._where(rto_code, report_type, year)
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        return self._select('revisions', where, params)
+
+    def revisions(self):
+        """Each revision timestamp with the number of values it changed"""
+        return pd.read_sql_query(
+            "SELECT revision AS Revision, COUNT(*) AS Changed FROM revisions GROUP BY revision ORDER BY revision",
+            self.con
+        )
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Multi-year Vahan history with upserts and point-in-time queries")
+
+    parser.add_argument("--db", type=str, default="vahan_history.sqlite", help="History database file")
+    parser.add_argument("--import", dest="imports", nargs="+", default=None,
+                        help="Consolidated .parquet/.csv file(s) to merge into the store")
+    parser.add_argument("--revision", type=str, default=None,
+                        help="Timestamp of the scrape being imported, e.g. 2025-03-06 (default: now)")
+    parser.add_argument("--latest", action="store_true", help="Show the current value of every key")
+    parser.add_argument("--as-of", type=str, default=None, help="Show the data as it stood on this date")
+    parser.add_argument("--revisions", action="store_true", help="List the revisions in the store")
+    parser.add_argument("--rto", type=str, default=None, help="Filter by RTO code")
+    parser.add_argument("--report-type", type=str, default=None, help="Filter by report type")
+    parser.add_argument("--year", type=int, default=None, help="Filter by year")
+    parser.add_argument("--state", type=str, default=None, help="Filter by state")
+    parser.add_argument("--output", type=str, default=None, help="Save the query result to .csv or .parquet")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with TimeSeriesStore(args.db) as store:
+        for path in args.imports or []:
+            df = pd.read_parquet(path) if path.lower().endswith('.parquet') else pd.read_csv(path)
+            changed, unchanged = store.upsert(df, args.revision)
+            print(f"{path}: {changed} rows new or revised, {unchanged} unchanged")
+
+        if args.revisions:
+            print(store.revisions().to_string(index=False))
+
+        result = None
+        filters = dict(rto_code=args.rto, report_type=args.report_type, year=args.year, state=args.state)
+        if args.as_of:
+            result = store.as_of(args.as_of, **filters)
+        elif args.latest:
+            result = store.latest(**filters)
+
+        if result is not None:
+            if args.output:
+                if args.output.lower().endswith('.parquet'):
+                    result.to_parquet(args.output, index=False)
+                else:
+                    result.to_csv(args.output, index=False)
+                print(f"{len(result)} rows saved to {args.output}")
+            else:
+                print(result.to_string(index=False))
@@ -0,0 +1,153 @@
+import os
+import argparse
+import duckdb
+
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+_MONTH_LIST = '[' + ', '.join(f"'{m}'" for m in MONTHS) + ']'
+
+# Ready-made views, the same steps the M Query flow performs on every refresh.
+# "unpivoted" is defined per dataset in VahanQuery._create_views since it depends on
+# whether the Parquet file was written wide or with --tidy.
+VIEWS = {
+    'rto_split': """
+        SELECT DISTINCT
+            "State",
+            "RTO Name",
+            "RTO Code",
+            "RTO Name" || ' - ' || "RTO Code" AS "RTO",
+            regexp_extract("RTO Code", '^[A-Z]+') AS "Code Prefix",
+            TRY_CAST(NULLIF(regexp_extract("RTO Code", '[0-9]+$'), '') AS INTEGER) AS "Code Number"
+        FROM unpivoted
+        ORDER BY "State", "Code Prefix", "Code Number", "RTO Code"
+    """,
+    'state_totals': """
+        SELECT
+            "Report Type",
+            "State",
+            "Year",
+            "Month",
+            "Month No",
+            CAST(SUM("Count") AS BIGINT) AS "Count"
+        FROM unpivoted
+        GROUP BY ALL
+        ORDER BY "Report Type", "State", "Year", "Month No"
+    """,
+}
+
+VIEW_HELP = {
+    'unpivoted': "One row per Year/Month/State/RTO/Report Type/Category",
+    'rto_split': "Every RTO with its name, code, code prefix and number",
+    'state_totals': "Registrations per Report Type, State, Year and Month",
+}
+
+
+class VahanQuery:
+    """DuckDB session over one or more consolidated Parquet files from Final_Boss_Version"""
+
+    def __init__(self, parquet_paths, database=':memory:'):
+        if isinstance(parquet_paths, (str, os.PathLike)):
+            parquet_paths = [parquet_paths]
+        self.paths = [str(p) for p in parquet_paths]
+        self.con = duckdb.connect(database)
+        self._create_views()
+
+    def _create_views(self):
+        files = '[' + ', '.join("'" + p.replace("'", "''") + "'" for p in self.paths) + ']'
+        self.con.execute(f"CREATE OR REPLACE VIEW consolidated AS "
+                         f"SELECT * FROM read_parquet({files}, union_by_name = true)")
+
+        columns = [row[0] for row in self.con.execute("DESCRIBE consolidated").fetchall()]
+        if 'Month' in columns:
+            # Written with --tidy: already one row per month
+            unpivot = 'SELECT * EXCLUDE ("Month"), CAST("Month" AS VARCHAR) AS "Month" FROM consolidated'
+        else:
+            months = ', '.join(f'"{m}"' for m in MONTHS if m in columns)
+            if not months:
+                raise ValueError(f"No month columns found in {', '.join(self.paths)}")
+            unpivot = (f'SELECT * FROM (UNPIVOT (SELECT * EXCLUDE ("TOTAL") FROM consolidated) '
+                       f'ON {months} INTO NAME "Month" VALUE "Count")')
+        # Month No gives calendar order for sorting, since Month is plain text in Parquet
+        self.con.execute(f'CREATE OR REPLACE VIEW unpivoted AS SELECT *, '
+                         f'list_position({_MONTH_LIST}, "Month") AS "Month No" FROM ({unpivot})')
+
+        for name, query in VIEWS.items():
+            self.con.execute(f"CREATE OR REPLACE VIEW {name} AS {query}")
+
+    def views(self):
+        """Names of the ready-made views"""
+        return ['unpivoted'] + list(VIEWS)
+
+    def sql(self, query, params=None):
+        """Run ad-hoc SQL against the views and return a DataFrame"""
+        return self.con.execute(query, params).df()
+
+    def view(self, name, where=None, limit=None):
+        """Return a ready-made view as a DataFrame, optionally filtered with a SQL WHERE clause"""
+        if name not in self.views():
+            raise ValueError(f"Unknown view: {name}. Available: {', '.join(self.views())}")
+        query = f"SELECT * FROM {name}"
+        if where:
+            query += f" WHERE {where}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return self.sql(query)
+
+    def export(self, query, output_file):
+        """Write a query result to .csv or .parquet without going through pandas"""
+        fmt = 'PARQUET' if str(output_file).lower().endswith('.parquet') else 'CSV, HEADER'
+        target = str(output_file).replace("'", "''")
+        self.con.execute(f"COPY ({query}) TO '{target}' (FORMAT {fmt})")
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Query the consolidated Vahan dataset with DuckDB")
+
+    parser.add_argument("parquet", nargs="+", help="Parquet file(s) written by Final_Boss_Version")
+    parser.add_argument(
+        "--view",
+        choices=sorted(VIEW_HELP),
+        default=None,
+        help="Ready-made view: " + "; ".join(f"{k}: {v}" for k, v in VIEW_HELP.items())
+    )
+    parser.add_argument("--sql", type=str, default=None, help="Ad-hoc SQL over the views, e.g. 'SELECT ... FROM unpivoted'")
+    parser.add_argument("--where", type=str, default=None, help="SQL filter applied to --view")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum rows to return")
+    parser.add_argument("--output", type=str, default=None, help="Save the result to .csv or .parquet instead of printing")
+    parser.add_argument("--list", action="store_true", help="List the ready-made views and their columns")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with VahanQuery(args.parquet) as vq:
+        if args.list or not (args.view or args.sql):
+            for name in vq.views():
+                columns = [row[0] for row in vq.con.execute(f"DESCRIBE {name}").fetchall()]
+                print(f"{name}: {', '.join(columns)}")
+        else:
+            if args.sql:
+                query = args.sql
+            else:
+                query = f"SELECT * FROM {args.view}" + (f" WHERE {args.where}" if args.where else "")
+            if args.limit:
+                query = f"SELECT * FROM ({query}) LIMIT {args.limit}"
+
+            if args.output:
+                vq.export(query, args.output)
+                print(f"Saved to {args.output}")
+            else:
+                vq.con.sql(query).show(max_rows=args.limit or 40)
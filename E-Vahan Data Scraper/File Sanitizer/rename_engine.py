@@ -0,0 +1,363 @@
+import os
+import re
+import sys
+import csv
+import errno
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from multiprocessing import Pool
+
+# Shared zip-level title reader, in E-Vahan Data Scraper/Utilities
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utilities'))
+import title_reader
+
+# Configure logging
+logging.basicConfig(
+    filename='mass_excel_rename.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Hardcoded path - MODIFY WITH YOUR SPECIFIC PATH
+ROOT_DIR = r"F:\Flipcarbon\Ajax\Maker"
+
+# Kept in ROOT_DIR unless --journal / --cache say otherwise
+JOURNAL_FILE = 'rename_journal.jsonl'
+TITLE_CACHE_FILE = 'title_cache.json'
+
+
+def extract_name_from_title(title, filename):
+    """Extract just the location code from the title"""
+    # Get just "Baratang - AN201" from
+    # "Maker Month Wise Data of Baratang - AN201 , Andaman & Nicobar Island (2024)"
+    if "Maker Month Wise Data" in title:
+        # Handle both "Maker Month Wise Data of" and "Maker Month Wise Data  of" (extra space)
+        if "Maker Month Wise Data of " in title:
+            start = title.find("Maker Month Wise Data of ") + len("Maker Month Wise Data of ")
+        else:
+            start = title.find("Maker Month Wise Data  of ") + len("Maker Month Wise Data  of ")
+
+        # Up to the comma after the location code, else the state in parentheses, else the end
+        end = title.find(",", start)
+        if end == -1:
+            end = title.find(" (", start)
+        return (title[start:end] if end != -1 else title[start:]).strip()
+
+    # Fallback - use original filename
+    logging.warning(f"Could not extract name from title: '{title}', using original filename")
+    return os.path.splitext(filename)[0]
+
+
+def _write_journal(journal_path, entries):
+    """Replace the journal with `entries` in one step"""
+    temp_path = journal_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry) + '\n' for entry in entries)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, journal_path)
+
+
+def _append_record(journal, record):
+    journal.write(json.dumps(record) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def _settle(src, dst):
+    """
+    Decide from the disk whether a rename with an intent record but no commit record
+    happened. Returns its journal entry, or None if src still holds the file.
+    """
+    if src.lower() == dst.lower():
+        # Case-only rename: both paths resolve on Windows, so look at the actual name
+        done = os.path.basename(dst) in os.listdir(os.path.dirname(dst))
+    else:
+        if os.path.exists(src) and os.path.exists(dst) and os.path.samefile(src, dst):
+            os.unlink(src)  # interrupted between link and unlink
+        done = os.path.exists(dst) and not os.path.exists(src)
+    if not done:
+        return None
+    stat = os.stat(dst)
+    logging.info(f"Interrupted rename {src} -> {dst} had completed")
+    return {'src': src, 'dst': dst, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'time': None}
+
+
+def load_journal(journal_path):
+    """
+    Completed renames, oldest first. Renames cut off between their intent and commit
+    records are settled from what is on disk, and the journal is rewritten without them.
+    """
+    entries, pending = [], {}
+    if os.path.exists(journal_path):
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                key = (record['src'], record['dst'])
+                if record.get('op') == 'intent':
+                    pending[key] = len(entries)
+                    entries.append(None)
+                elif key in pending:
+                    entries[pending.pop(key)] = record
+                else:
+                    entries.append(record)
+    for (src, dst), index in pending.items():
+        entries[index] = _settle(src, dst)
+    entries = [e for e in entries if e]
+    if pending:
+        _write_journal(journal_path, entries)
+    return entries
+
+
+def move_no_clobber(src, dst):
+    """
+    Rename src to dst, failing with FileExistsError instead of replacing a file at dst.
+    A hard link claims dst atomically; filesystems without hard links (FAT, exFAT)
+    fall back to a check followed by os.rename.
+    """
+    if src.lower() == dst.lower():
+        # Case-only rename: dst is src itself on Windows, so the link would always fail
+        if os.path.exists(dst) and not os.path.samefile(src, dst):
+            raise FileExistsError(errno.EEXIST, "Target exists", dst)
+        os.rename(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        if os.path.exists(dst):
+            raise FileExistsError(errno.EEXIST, "Target exists", dst)
+        os.rename(src, dst)
+        return
+    try:
+        os.unlink(src)
+    except OSError:
+        os.unlink(dst)  # src is locked; leave things as they were
+        raise
+
+
+def iter_excel_files(root_dir):
+    """Yield (folder, filename) for every export below root_dir"""
+    for folder, _, files in os.walk(root_dir):
+        for filename in files:
+            if filename.lower().endswith('.xlsx') and not filename.startswith('~$'):
+                yield folder, filename
+
+
+def _init_worker(cache_path):
+    title_reader.load_cache(cache_path)
+
+
+def _read_title(args):
+    """Worker: (folder, filename, title or None, error or None, cache entry)"""
+    folder, filename = args
+    path = os.path.join(folder, filename)
+    try:
+        title = title_reader.read_title(path)
+        return folder, filename, title, None, title_reader.cache_entry(path)
+    except Exception as e:
+        return folder, filename, None, f"{type(e).__name__}: {e}", None
+
+
+def read_titles(files, cache_path, jobs=None, chunksize=32):
+    """Read cell A1 of every file in parallel; returns ({(folder, filename): title}, [errors])"""
+    title_reader.load_cache(cache_path)
+    titles, errors, cache_entries = {}, [], {}
+    start = time.time()
+    with Pool(processes=jobs, initializer=_init_worker, initargs=(cache_path,)) as pool:
+        for done, (folder, filename, title, error, entry) in enumerate(
+                pool.imap_unordered(_read_title, files, chunksize=chunksize), 1):
+            if error:
+                logging.error(f"Excel read failed: {os.path.join(folder, filename)}: {error}")
+                errors.append({'folder': folder, 'filename': filename, 'error': error})
+            else:
+                titles[(folder, filename)] = title
+                if entry:
+                    cache_entries[os.path.join(folder, filename)] = entry
+            if done % 1000 == 0:
+                print(f"Read {done}/{len(files)} titles ({time.time() - start:.1f}s)")
+
+    title_reader.update_cache(cache_entries)
+    title_reader.save_cache(cache_path)
+    return titles, errors
+
+
+def build_plan(root_dir, journal_path, cache_path, jobs=None):
+    """
+    Work out every rename before touching any file.
+
+    Files the journal shows as already renamed (same path, size and mtime) are skipped
+    without being opened. Targets that collide with an existing file or with another
+    planned target get a _2, _3, ... suffix, so the same tree always gives the same plan.
+    A file already named for its title, with or without such a suffix, is left alone.
+
+    Returns:
+        (plan, errors, skipped) where plan is a list of {'src', 'dst'} dicts
+    """
+    renamed = {e['dst']: (e['size'], e['mtime']) for e in load_journal(journal_path)}
+    files, skipped = [], 0
+    for folder, filename in iter_excel_files(root_dir):
+        path = os.path.join(folder, filename)
+        stat = os.stat(path)
+        if renamed.get(path) == (stat.st_size, stat.st_mtime_ns):
+            skipped += 1
+        else:
+            files.append((folder, filename))
+    print(f"{skipped} files already renamed according to the journal, {len(files)} to check")
+
+    titles, errors = read_titles(files, cache_path, jobs) if files else ({}, [])
+
+    plan = []
+    taken = {}  # folder -> lower-cased names present or planned
+    for folder, filename in sorted(titles):
+        new_name = extract_name_from_title(titles[(folder, filename)], filename)
+        new_name = new_name.replace('/', '-').replace('\\', '-').strip()
+        if not new_name:
+            errors.append({'folder': folder, 'filename': filename, 'error': "Failed to extract a valid name"})
+            continue
+        ext = os.path.splitext(filename)[1]
+        # Already named for its title, possibly with the suffix an earlier run gave it
+        if re.fullmatch(rf"{re.escape(new_name)}(_\d+)?{re.escape(ext)}", filename, re.IGNORECASE):
+            skipped += 1
+            continue
+
+        # Case-insensitive, as on Windows; the file's own name does not block its target
+        if folder not in taken:
+            taken[folder] = {f.lower() for f in os.listdir(folder)}
+        candidate, n = f"{new_name}{ext}", 1
+        while candidate.lower() in taken[folder] and candidate.lower() != filename.lower():
+            n += 1
+            candidate = f"{new_name}_{n}{ext}"
+        if n > 1:
+            logging.warning(f"Duplicate name, using {candidate} for {filename}")
+        taken[folder].add(candidate.lower())
+        plan.append({'src': os.path.join(folder, filename), 'dst': os.path.join(folder, candidate)})
+
+    return plan, errors, skipped
+
+
+def save_plan(plan, plan_path):
+    with open(plan_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['src', 'dst'])
+        writer.writeheader()
+        writer.writerows(plan)
+    print(f"Plan saved to {plan_path}")
+
+
+def execute_plan(plan, journal_path):
+    """
+    Apply the plan. Each rename is bracketed by an intent record written before it and
+    a commit record written after it, both fsynced, so an interrupted run can be resumed
+    or undone. A file that has appeared at a target since planning is never replaced.
+    """
+    done, failed = 0, []
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        for item in plan:
+            src, dst = item['src'], item['dst']
+            _append_record(journal, {'op': 'intent', 'src': src, 'dst': dst})
+            try:
+                move_no_clobber(src, dst)
+            except OSError as e:
+                logging.error(f"{src} - {str(e)}")
+                failed.append({'folder': os.path.dirname(src), 'filename': os.path.basename(src), 'error': str(e)})
+                continue
+            stat = os.stat(dst)
+            _append_record(journal, {
+                'op': 'commit', 'src': src, 'dst': dst, 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                'time': datetime.now().isoformat(timespec='seconds'),
+            })
+            done += 1
+    return done, failed
+
+
+def undo(journal_path):
+    """
+    Reverse every journalled rename, newest first, then retire the journal. When some
+    cannot be reversed, the journal is rewritten with just those, so a later undo
+    retries them without tripping over the ones already restored.
+    """
+    entries = load_journal(journal_path)
+    restored, remaining = 0, []
+    for entry in reversed(entries):
+        src, dst = entry['src'], entry['dst']
+        try:
+            if not os.path.exists(dst):
+                raise FileNotFoundError(errno.ENOENT, "File is gone", dst)
+            move_no_clobber(dst, src)
+        except OSError as e:
+            print(f"Cannot undo {dst} -> {src}: {e}")
+            remaining.append(entry)
+            continue
+        restored += 1
+    if not remaining:
+        os.replace(journal_path, f"{journal_path}.{datetime.now():%Y%m%d_%H%M%S}.undone")
+    elif restored:
+        _write_journal(journal_path, list(reversed(remaining)))
+    print(f"Restored {restored} of {len(entries)} files")
+    return restored, len(remaining)
+
+
+def print_summary(plan, errors, skipped, executed=None):
+    """Print totals and a sample of the plan and errors"""
+    print("\nSample of the plan:")
+    print("-" * 100)
+    for item in plan[:10]:
+        print(f"{os.path.basename(item['src'])} -> {os.path.basename(item['dst'])}   ({os.path.dirname(item['src'])})")
+    if len(plan) > 10:
+        print(f"...and {len(plan) - 10} more")
+    for error in errors[:10]:
+        print(f"ERROR {os.path.join(error['folder'], error['filename'])}: {error['error']}")
+    if len(errors) > 10:
+        print(f"...and {len(errors) - 10} more errors, see mass_excel_rename.log")
+    print("-" * 100)
+    print(f"Planned: {len(plan)} | Skipped: {skipped} | Errors: {len(errors)}"
+          + (f" | Renamed: {executed}" if executed is not None else " | Dry run, nothing renamed"))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Rename Vahan exports after the RTO named in their title")
+
+    parser.add_argument("root", nargs="?", default=ROOT_DIR, help="Folder with the exports")
+    parser.add_argument("--execute", action="store_true", help="Apply the plan (default: dry run)")
+    parser.add_argument("--plan", type=str, default=None, help="Save the rename plan to this .csv")
+    parser.add_argument("--undo", action="store_true", help="Reverse the renames recorded in the journal")
+    parser.add_argument("--journal", type=str, default=None, help=f"Undo journal (default: <root>/{JOURNAL_FILE})")
+    parser.add_argument("--cache", type=str, default=None, help=f"Title cache (default: <root>/{TITLE_CACHE_FILE})")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for reading titles (default: CPU count)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: Path does not exist or is not a directory\n{args.root}")
+        sys.exit(1)
+    journal_path = args.journal or os.path.join(args.root, JOURNAL_FILE)
+    cache_path = args.cache or os.path.join(args.root, TITLE_CACHE_FILE)
+
+    start = time.time()
+    if args.undo:
+        undo(journal_path)
+    else:
+        plan, errors, skipped = build_plan(args.root, journal_path, cache_path, args.jobs)
+        if args.plan:
+            save_plan(plan, args.plan)
+        executed = None
+        if args.execute:
+            executed, failed = execute_plan(plan, journal_path)
+            errors.extend(failed)
+        print_summary(plan, errors, skipped, executed)
+
+    print(f"\nTotal processing time: {time.time() - start:.2f} seconds")
+    print(f"Log file: mass_excel_rename.log")
@@ -3,7 +3,7 @@ import time
 import logging
 import warnings
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 import pandas as pd
 import openpyxl
 from openpyxl.styles import PatternFill, Font
@@ -16,6 +16,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException, ElementNotInteractableException
 import re
+import sys
+import pickle
+
+# Shared zip-level title reader
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Utilities'))
+import title_reader
 
 # Suppress style warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl.styles.stylesheet')
@@ -31,8 +37,11 @@ logging.basicConfig(
 # Hardcoded paths - MODIFY WITH YOUR SPECIFIC PATHS
 ROOT_DIR = r"C:\Users\ASUS\OneDrive\Desktop\Work\Vehicle Category"  # Path to your downloaded Excel files
 OUTPUT_DIR = r"C:\Users\ASUS\OneDrive\Desktop\Work\Vehicle Category"  # Path to save reports
-SCRAPED_DATA_PATH = os.path.join(OUTPUT_DIR, "vahan_states_rtos.xlsx")  # Path to save scraped data
-REPORT_PATH = os.path.join(OUTPUT_DIR, "rto_download_status.xlsx")  # Path to save the final report
+SCRAPED_DATA_PATH = os.path.join(OUTPUT_DIR, "vahan_states_rtos.xlsx")  # Scraped data from older runs, read once to seed the catalog
+CATALOG_PATH = os.path.join(OUTPUT_DIR, "vahan_states_rtos.pkl")  # Cached official state/RTO catalog
+CATALOG_MAX_AGE_DAYS = 7  # Catalogs older than this are re-checked against the website
+REPORT_PATH = os.path.join(OUTPUT_DIR, "rto_download_status.xlsx")  # Path to save the final report (.xlsx, .csv or .html)
+TITLE_CACHE_PATH = os.path.join(OUTPUT_DIR, "title_cache.json")  # Titles already read, by path, size and mtime
 
 # Debug mode - set to True for verbose output
 DEBUG_MODE = True
@@ -48,27 +57,14 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # ==============================================
 
 def fast_read_title(file_path):
-    """Quickly read first cell using openpyxl without loading full file"""
+    """Read the first cell straight from the zip (cached by path, size and mtime)"""
     try:
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheet = wb.active
-        title_value = sheet.cell(row=1, column=1).value
-        
-        # Handle None values
-        if title_value is None:
-            return ""
-        return str(title_value)
+        return title_reader.read_title(file_path)
     except Exception as e:
         logging.error(f"Excel read failed: {file_path}: {str(e)}")
         if DEBUG_MODE:
             print(f"Excel read failed: {file_path}: {str(e)}")
         return ""
-    finally:
-        if 'wb' in locals():
-            try:
-                wb.close()
-            except:
-                pass  # Ignore errors on close
 
 def extract_name_from_title(title, filename):
     """Extract just the location code from the title"""
@@ -129,26 +125,53 @@ def process_file(args):
             print(f"Error: {error_msg}")
         return None
 
-def process_downloaded_files(max_workers=4):
+def iter_excel_files(root_dir):
+    """Yield (folder, filename) for every Excel file as the walk finds it"""
+    for folder, _, files in os.walk(root_dir):
+        for f in files:
+            if f.lower().endswith(('.xlsx', '.xls')):
+                yield (folder, f)
+
+def _init_worker(cache_path):
+    """Give each worker process the titles saved by earlier runs"""
+    title_reader.load_cache(cache_path)
+
+def _scan_file(args):
+    """process_file plus the title cache entry, so the parent can persist it"""
+    location_code = process_file(args)
+    file_path = os.path.join(*args)
+    return location_code, file_path, title_reader.cache_entry(file_path)
+
+def process_downloaded_files(max_workers=None, chunksize=32):
     """Process all downloaded Excel files to extract RTO information"""
     print("\nAnalyzing downloaded Excel files...")
+    max_workers = max_workers or os.cpu_count()
+    
+    downloaded_rtos = []
+    cache_entries = {}
+    processed = 0
+    start_time = time.time()
+    
+    # Title parsing is CPU-bound, so use processes; files are fed to the pool while the walk is still running
+    with Pool(max_workers, initializer=_init_worker, initargs=(TITLE_CACHE_PATH,)) as pool:
+        for location_code, file_path, entry in pool.imap_unordered(
+                _scan_file, iter_excel_files(ROOT_DIR), chunksize=chunksize):
+            processed += 1
+            if location_code is not None:
+                downloaded_rtos.append(location_code)
+            if entry is not None:
+                cache_entries[os.path.abspath(file_path)] = entry
+            
+            if processed % 500 == 0:
+                print(f"Analyzed {processed} files ({time.time() - start_time:.1f}s)")
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Collect all files first
-        all_files = []
-        for folder, _, files in os.walk(ROOT_DIR):
-            excel_files = [f for f in files if f.lower().endswith(('.xlsx', '.xls'))]
-            all_files.extend([(folder, f) for f in excel_files])
-        
-        file_count = len(all_files)
-        print(f"Found {file_count} Excel files to analyze")
-        
-        # Process files with progress updates
-        results = list(executor.map(process_file, all_files))
-        downloaded_rtos = [r for r in results if r is not None]
-        
-        print(f"Successfully extracted RTO information from {len(downloaded_rtos)} files")
-        return downloaded_rtos
+    title_reader.update_cache(cache_entries)
+    title_reader.save_cache(TITLE_CACHE_PATH)
+    
+    print(f"Analyzed {processed} Excel files")
+    print(f"Successfully extracted RTO information from {len(downloaded_rtos)} files "
+          f"in {time.time() - start_time:.1f}s")
+    return downloaded_rtos
 
 # ==============================================
 # Part 2: Vahan Website Scraping Functions
@@ -259,342 +282,414 @@ def find_dynamic_elements(driver):
     
     return dynamic_elements
 
-def scrape_vahan_states_and_rtos(chrome_path=CHROME_PATH):
-    """Scrape state and RTO information from the Vahan website."""
-    # Skip scraping if data file exists and user chooses to use it
+def load_catalog():
+    """Cached official catalog: {'scraped_at': datetime, 'states': {state label: [RTO labels]}}, or None"""
+    if os.path.exists(CATALOG_PATH):
+        try:
+            with open(CATALOG_PATH, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logging.error(f"Catalog cache unreadable, ignoring it: {str(e)}")
+    # Seed from the spreadsheet written by earlier versions of this script
     if os.path.exists(SCRAPED_DATA_PATH):
-        choice = input(f"Found existing scraped data at {SCRAPED_DATA_PATH}. Use this file? (y/n): ").lower()
-        if choice == 'y':
-            print(f"Using existing data from {SCRAPED_DATA_PATH}")
-            return pd.read_excel(SCRAPED_DATA_PATH)
-    
+        df = pd.read_excel(SCRAPED_DATA_PATH)
+        return {
+            'scraped_at': datetime.fromtimestamp(os.path.getmtime(SCRAPED_DATA_PATH)),
+            'states': {state: list(group['RTO']) for state, group in df.groupby('State', sort=False)},
+        }
+    return None
+
+def save_catalog(catalog):
+    with open(CATALOG_PATH, 'wb') as f:
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"Catalog saved to {CATALOG_PATH}")
+
+def catalog_to_df(catalog):
+    return pd.DataFrame(
+        [{'State': state, 'RTO': rto} for state, rtos in catalog['states'].items() for rto in rtos],
+        columns=['State', 'RTO']
+    )
+
+def _list_dropdown(driver, dropdown_id, label_id):
+    """Open a dropdown and return the data-label of every option except the first ("All ...") one"""
+    driver.execute_script(f"document.getElementById('{label_id}').click();")
+    time.sleep(1)
+    labels = driver.execute_script(f"""
+        var items = document.querySelectorAll('#{dropdown_id}_items li');
+        var labels = [];
+        for (var i = 1; i < items.length; i++) {{  // Skip first "All" option
+            labels.push(items[i].getAttribute('data-label'));
+        }}
+        return labels;
+    """)
+    # Close the dropdown
+    driver.execute_script("document.body.click();")
+    time.sleep(1)
+    return labels
+
+def _list_state_rtos(driver, elements, state_name):
+    """Select a state and return the labels of its RTOs"""
+    state_dropdown_id = elements["state_dropdown_id"]
+    state_dropdown_label_id = elements["state_dropdown_label_id"]
+
+    # Use JavaScript to select the state - this is more reliable
+    driver.execute_script(f"""
+        // First, open the dropdown
+        document.getElementById('{state_dropdown_label_id}').click();
+        // Small delay
+        setTimeout(function() {{
+            // Find and click the state option
+            var items = document.querySelectorAll('#{state_dropdown_id}_items li');
+            for (var i = 0; i < items.length; i++) {{
+                if (items[i].getAttribute('data-label') === "{state_name}") {{
+                    items[i].click();
+                    break;
+                }}
+            }}
+        }}, 500);
+    """)
+
+    # Wait for state selection to take effect and RTO dropdown to update
+    time.sleep(3)
+    return _list_dropdown(driver, elements["rto_dropdown_id"], elements["rto_dropdown_label_id"])
+
+def scrape_vahan_states_and_rtos(chrome_path=CHROME_PATH, max_age_days=CATALOG_MAX_AGE_DAYS, force=False):
+    """
+    Official state and RTO list from the Vahan website, cached in CATALOG_PATH.
+
+    A catalog younger than max_age_days is used without opening the browser. An older one
+    (or force=True) is checked against the state dropdown only: each label carries the
+    state's RTO count, e.g. 'Bihar(48)', so only states whose label changed are
+    enumerated again.
+    """
+    catalog = load_catalog()
+    if catalog and not force:
+        age = datetime.now() - catalog['scraped_at']
+        if age.days < max_age_days:
+            print(f"Using catalog from {catalog['scraped_at']:%Y-%m-%d %H:%M} ({len(catalog['states'])} states)")
+            return catalog_to_df(catalog)
+    cached_states = catalog['states'] if catalog else {}
+
     # Initialize the Chrome WebDriver
     driver = setup_driver(chrome_path)
-    
+
     # Navigate to the website
     url = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
     print(f"Navigating to {url}")
     driver.get(url)
-    
-    # Wait for the page to load
-    wait = WebDriverWait(driver, 20)
+
     print("Waiting for page to load...")
     time.sleep(5)  # Increased initial wait time
-    
-    # Store all state-RTO pairs
-    all_data = []
-    
+
+    states = {}
+    complete = False
     try:
-        # Find dynamic elements
-        dynamic_elements = find_dynamic_elements(driver)
-        
-        # Use the dynamic element IDs
-        state_dropdown_id = dynamic_elements["state_dropdown_id"]
-        rto_dropdown_id = dynamic_elements["rto_dropdown_id"]
-        state_dropdown_label_id = dynamic_elements["state_dropdown_label_id"]
-        rto_dropdown_label_id = dynamic_elements["rto_dropdown_label_id"]
-        
-        if not state_dropdown_id or not rto_dropdown_id:
+        elements = find_dynamic_elements(driver)
+
+        if not all(elements.values()):
             print("Critical elements not found. Taking screenshot and saving page source for debugging...")
             driver.save_screenshot(os.path.join(OUTPUT_DIR, "missing_elements_screenshot.png"))
             with open(os.path.join(OUTPUT_DIR, "page_source.html"), "w", encoding="utf-8") as f:
                 f.write(driver.page_source)
             raise Exception("Could not find all required dynamic elements")
-        
-        # First, get all states using JavaScript for reliability
+
+        # The state labels are the freshness probe
         print("Fetching all states...")
-        driver.execute_script(f"document.getElementById('{state_dropdown_label_id}').click();")
-        time.sleep(1)
-        
-        states_data = driver.execute_script(f"""
-            var stateItems = document.querySelectorAll('#{state_dropdown_id}_items li');
-            var states = [];
-            for (var i = 1; i < stateItems.length; i++) {{  // Skip first "All States" option
-                states.push({{
-                    label: stateItems[i].getAttribute('data-label'),
-                    value: stateItems[i].textContent.trim()
-                }});
-            }}
-            return states;
-        """)
-        
-        # Close the dropdown
-        driver.execute_script("document.body.click();")
-        time.sleep(1)
-        
-        print(f"Found {len(states_data)} states to process")
-        
-        # Process each state
-        for idx, state_data in enumerate(states_data):
-            state_name = state_data['label']
-            print(f"Processing state {idx+1}/{len(states_data)}: {state_name}")
-            
-            # Use JavaScript to select the state - this is more reliable
-            driver.execute_script(f"""
-                // First, open the dropdown
-                document.getElementById('{state_dropdown_label_id}').click();
-                // Small delay
-                setTimeout(function() {{
-                    // Find and click the state option
-                    var items = document.querySelectorAll('#{state_dropdown_id}_items li');
-                    for (var i = 0; i < items.length; i++) {{
-                        if (items[i].getAttribute('data-label') === "{state_name}") {{
-                            items[i].click();
-                            break;
-                        }}
-                    }}
-                }}, 500);
-            """)
-            
-            # Wait for state selection to take effect and RTO dropdown to update
-            time.sleep(3)
-            
-            # Now get RTOs using JavaScript
-            driver.execute_script(f"document.getElementById('{rto_dropdown_label_id}').click();")
-            time.sleep(2)
-            
-            rtos_data = driver.execute_script(f"""
-                var rtoItems = document.querySelectorAll('#{rto_dropdown_id}_items li');
-                var rtos = [];
-                for (var i = 1; i < rtoItems.length; i++) {{  // Skip first "All Offices" option
-                    rtos.push({{
-                        label: rtoItems[i].getAttribute('data-label'),
-                        value: rtoItems[i].textContent.trim()
-                    }});
-                }}
-                return rtos;
-            """)
-            
-            # Close the dropdown
-            driver.execute_script("document.body.click();")
-            time.sleep(1)
-            
-            # Add the RTOs to our data collection
-            for rto_data in rtos_data:
-                rto_name = rto_data['label']
-                if DEBUG_MODE:
+        state_labels = _list_dropdown(driver, elements["state_dropdown_id"], elements["state_dropdown_label_id"])
+        # A label embeds the RTO count, so a state with added or removed RTOs has a new label
+        changed = [s for s in state_labels if not cached_states.get(s)]
+        print(f"Found {len(state_labels)} states, {len(changed)} new or changed since the last catalog")
+
+        for state_name in state_labels:
+            if state_name not in changed:
+                states[state_name] = cached_states[state_name]
+                continue
+            print(f"Enumerating state {changed.index(state_name) + 1}/{len(changed)}: {state_name}")
+            rtos = _list_state_rtos(driver, elements, state_name)
+            if DEBUG_MODE:
+                for rto_name in rtos:
                     print(f"  RTO: {rto_name}")
-                all_data.append({
-                    'State': state_name,
-                    'RTO': rto_name
-                })
-            
-            # If no RTOs were found, log a warning
-            if not rtos_data:
+            if not rtos:
                 print(f"  Warning: No RTOs found for state {state_name}")
-                
+            states[state_name] = rtos
+        complete = True
+
     except Exception as e:
         print(f"An error occurred during scraping: {e}")
         driver.save_screenshot(os.path.join(OUTPUT_DIR, "error_screenshot.png"))
         with open(os.path.join(OUTPUT_DIR, "error_page_source.html"), "w", encoding="utf-8") as f:
             f.write(driver.page_source)
         print("Saved error screenshot and page source for debugging")
-    
+
     finally:
         # Close the browser
         driver.quit()
-        
-        # Convert the data to a DataFrame
-        df = pd.DataFrame(all_data)
-        
-        # Save the data to an Excel file
-        if not df.empty:
-            df.to_excel(SCRAPED_DATA_PATH, index=False)
-            print(f"Data saved to {SCRAPED_DATA_PATH}")
-            print(f"Total records: {len(df)}")
-        else:
-            print("No data was collected")
-        
-        return df
+
+    if complete:
+        catalog = {'scraped_at': datetime.now(), 'states': states}
+        save_catalog(catalog)
+    elif catalog:
+        # A partial scrape must not replace a full catalog
+        print("Scrape incomplete, using the previous catalog")
+    else:
+        catalog = {'states': states}
+
+    df = catalog_to_df(catalog)
+    if df.empty:
+        print("No data was collected")
+    else:
+        print(f"Total records: {len(df)}")
+    return df
 
 # ==============================================
 # Part 3: Analysis and Report Generation
 # ==============================================
 
+# RTO code at the end of a name, e.g. "Baratang - AN201" -> AN201
+RTO_CODE_PATTERN = re.compile(r'\b([A-Za-z]{2})\s*0*(\d{1,4})([A-Za-z]?)\s*$')
+
+def normalize_rto_name(name):
+    """Lowercase with whitespace collapsed, so spacing differences in titles do not matter"""
+    return ' '.join(str(name).lower().split())
+
+def normalize_rto_code(name):
+    """Code at the end of an RTO name in canonical form (AS015 -> AS15), or None"""
+    match = RTO_CODE_PATTERN.search(' '.join(str(name).replace('-', ' ').split()))
+    if not match:
+        return None
+    prefix, number, suffix = match.groups()
+    return f"{prefix.upper()}{int(number)}{suffix.upper()}"
+
+class RTOMatcher:
+    """
+    Index over the official RTO list for matching downloaded names.
+
+    Lookups try, in order: the normalized full name, the normalized RTO code, then a
+    token index that narrows partial matches to RTOs sharing a word with the query.
+    Ties always go to the RTO that comes first in the official list.
+    """
+    
+    def __init__(self, official_rtos):
+        self.official = list(official_rtos)
+        self.by_name = {}
+        self.by_code = {}
+        self.by_token = {}
+        for idx, rto in enumerate(self.official):
+            name = normalize_rto_name(rto)
+            self.by_name.setdefault(name, idx)
+            code = normalize_rto_code(rto)
+            if code:
+                self.by_code.setdefault(code, idx)
+            for token in set(name.replace('-', ' ').split()):
+                self.by_token.setdefault(token, []).append(idx)
+    
+    def match(self, name):
+        """Return (official RTO, how) with how in exact/code/partial, or (None, None)"""
+        name_lower = normalize_rto_name(name)
+        if name_lower in self.by_name:
+            return self.official[self.by_name[name_lower]], 'exact'
+        
+        code = normalize_rto_code(name)
+        if code in self.by_code:
+            return self.official[self.by_code[code]], 'code'
+        
+        # Only RTOs sharing a word with the name can contain it (or be contained in it)
+        candidates = set()
+        for token in set(name_lower.replace('-', ' ').split()):
+            candidates.update(self.by_token.get(token, ()))
+        for idx in sorted(candidates):
+            official_lower = normalize_rto_name(self.official[idx])
+            if name_lower in official_lower or official_lower in name_lower:
+                return self.official[idx], 'partial'
+        return None, None
+
 def match_rto_names(rto_codes, all_rtos):
     """Match downloaded RTO codes with official RTO names"""
     matched = []
     unmatched = []
-    
-    # Convert all RTO names to lowercase for case-insensitive matching
-    all_rtos_lower = {rto.lower(): rto for rto in all_rtos}
+    matcher = RTOMatcher(all_rtos)
     
     for code in rto_codes:
-        code_lower = code.lower()
-        
-        # Check for exact match
-        if code_lower in all_rtos_lower:
-            matched.append(all_rtos_lower[code_lower])
-            continue
-            
-        # Try partial matches
-        matched_any = False
-        for rto_lower, original_rto in all_rtos_lower.items():
-            # Check if the code contains the RTO name or vice versa
-            if code_lower in rto_lower or rto_lower in code_lower:
-                matched.append(original_rto)
-                matched_any = True
-                break
-                
-        if not matched_any:
+        official, _ = matcher.match(code)
+        if official is not None:
+            matched.append(official)
+        else:
             unmatched.append(code)
     
     return matched, unmatched
 
-def create_detailed_report(scraped_df, downloaded_rtos):
-    """Create a detailed Excel report showing which RTOs are downloaded and which are missing"""
+# Report cell styles: registered once as named styles in .xlsx, CSS classes in .html
+REPORT_STYLES = {
+    'header': {'font': Font(bold=True)},
+    'missing': {'fill': PatternFill(start_color="FFAAAA", end_color="FFAAAA", fill_type="solid")},  # Light red
+    'downloaded': {'fill': PatternFill(start_color="AAFFAA", end_color="AAFFAA", fill_type="solid")},  # Light green
+    'complete': {'fill': PatternFill(start_color="AAAAFF", end_color="AAAAFF", fill_type="solid")},  # Light blue
+}
+
+class ReportSheet:
+    """Rows of one report sheet, with column widths tracked as the rows are added"""
+    
+    def __init__(self, title, headers):
+        self.title = title[:31]  # Excel limits sheet names to 31 chars
+        self.headers = headers
+        self.rows = []
+        self.widths = [len(str(h)) for h in headers]
+    
+    def add_row(self, *cells):
+        """Add a row; each cell is a value or a (value, style name) pair"""
+        row = [c if isinstance(c, tuple) else (c, None) for c in cells]
+        for col, (value, _) in enumerate(row):
+            if value is not None:
+                self.widths[col] = max(self.widths[col], len(str(value)))
+        self.rows.append(row)
+    
+    def column_widths(self):
+        return [min(width + 2, 50) for width in self.widths]  # Cap width at 50
+
+def _write_report_xlsx(sheets, path):
+    """Stream the sheets through an openpyxl write-only workbook"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import NamedStyle
+    from openpyxl.utils import get_column_letter
+    
+    wb = openpyxl.Workbook(write_only=True)
+    for name, style in REPORT_STYLES.items():
+        wb.add_named_style(NamedStyle(name=name, **style))
+    
+    for sheet in sheets:
+        ws = wb.create_sheet(title=sheet.title)
+        # Widths must be set before the first row is streamed out
+        for col, width in enumerate(sheet.column_widths(), 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        
+        def styled(value, style):
+            if style is None:
+                return value
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            return cell
+        
+        ws.append([styled(h, 'header') for h in sheet.headers])
+        for row in sheet.rows:
+            ws.append([styled(value, style) for value, style in row])
+    wb.save(path)
+
+def _write_report_csv(sheets, path):
+    """One CSV per sheet: report_Summary.csv, report_<State>.csv, ..."""
+    import csv
+    stem, _ = os.path.splitext(path)
+    for sheet in sheets:
+        sheet_path = f"{stem}_{re.sub(r'[^A-Za-z0-9_-]+', '_', sheet.title)}.csv"
+        with open(sheet_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(sheet.headers)
+            writer.writerows([value for value, _ in row] for row in sheet.rows)
+
+def _write_report_html(sheets, path):
+    """Single HTML page with one table per sheet"""
+    from html import escape
+    
+    css = ["body { font-family: sans-serif; }", "table { border-collapse: collapse; margin-bottom: 2em; }",
+           "td, th { border: 1px solid #ccc; padding: 2px 8px; }", ".header { font-weight: bold; }"]
+    for name, style in REPORT_STYLES.items():
+        if 'fill' in style:
+            css.append(f".{name} {{ background: #{style['fill'].start_color.rgb[-6:]}; }}")
+    
+    def cell(value, style):
+        css = f' class="{style}"' if style else ''
+        return f"<td{css}>{'' if value is None else escape(str(value))}</td>"
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>RTO download status</title>"
+                f"<style>{' '.join(css)}</style></head><body>\n")
+        for sheet in sheets:
+            f.write(f"<h2>{escape(sheet.title)}</h2>\n<table>\n<tr>")
+            f.write(''.join(f"<th>{escape(str(h))}</th>" for h in sheet.headers))
+            f.write("</tr>\n")
+            for row in sheet.rows:
+                f.write("<tr>" + ''.join(cell(value, style) for value, style in row) + "</tr>\n")
+            f.write("</table>\n")
+        f.write("</body></html>\n")
+
+def write_report(sheets, path):
+    """Write the report sheets as .xlsx, .csv or .html, depending on the extension of path"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        _write_report_csv(sheets, path)
+    elif ext in ('.html', '.htm'):
+        _write_report_html(sheets, path)
+    else:
+        _write_report_xlsx(sheets, path)
+
+def create_detailed_report(scraped_df, downloaded_rtos, report_path=REPORT_PATH):
+    """Create a detailed report showing which RTOs are downloaded and which are missing"""
     print("\nGenerating detailed RTO download status report...")
     
-    # Create a new workbook
-    wb = openpyxl.Workbook()
-    summary_sheet = wb.active
-    summary_sheet.title = "Summary"
-    
-    # Define styles
-    header_font = Font(bold=True)
-    missing_fill = PatternFill(start_color="FFAAAA", end_color="FFAAAA", fill_type="solid")  # Light red
-    downloaded_fill = PatternFill(start_color="AAFFAA", end_color="AAFFAA", fill_type="solid")  # Light green
-    complete_fill = PatternFill(start_color="AAAAFF", end_color="AAAAFF", fill_type="solid")  # Light blue
-    
-    # Setup summary sheet headers
-    summary_headers = ["State", "Total RTOs", "Downloaded", "Missing", "Percentage Complete", "Status"]
-    for col, header in enumerate(summary_headers, 1):
-        cell = summary_sheet.cell(row=1, column=col, value=header)
-        cell.font = header_font
+    summary_sheet = ReportSheet("Summary", ["State", "Total RTOs", "Downloaded", "Missing", "Percentage Complete", "Status"])
+    state_sheets = []
     
     # Group the scraped data by state
     state_groups = scraped_df.groupby('State')
     
-    # Process each state
-    summary_row = 2
     all_rtos = scraped_df['RTO'].tolist()
     
-    # Convert downloaded RTOs to lowercase for case-insensitive matching
-    downloaded_rtos_lower = [rto.lower() for rto in downloaded_rtos if rto]
+    # Resolve every download to an official RTO once; the per-state pass is then dict lookups
+    matcher = RTOMatcher(all_rtos)
+    downloaded_by_rto = {}
+    unmatched_downloads = []
+    for downloaded_rto in downloaded_rtos:
+        if not downloaded_rto:
+            continue
+        official, how = matcher.match(downloaded_rto)
+        if official is None:
+            unmatched_downloads.append(downloaded_rto)
+        else:
+            downloaded_by_rto.setdefault(official, (downloaded_rto, how))
     
     # Process each state
     for state_name, state_group in state_groups:
         print(f"Processing state: {state_name}")
         
         # Create a sheet for this state
-        state_sheet = wb.create_sheet(title=state_name[:31])  # Excel limits sheet names to 31 chars
-        
-        # Add headers to the state sheet
-        state_headers = ["RTO Name", "Status", "Notes"]
-        for col, header in enumerate(state_headers, 1):
-            cell = state_sheet.cell(row=1, column=col, value=header)
-            cell.font = header_font
+        state_sheet = ReportSheet(state_name, ["RTO Name", "Status", "Notes"])
+        state_sheets.append(state_sheet)
         
         # Get all RTOs for this state
         state_rtos = state_group['RTO'].tolist()
-        state_rtos_lower = [rto.lower() for rto in state_rtos]
         
         # Check which RTOs have been downloaded
         downloaded_count = 0
-        state_row = 2
         
         for rto in state_rtos:
-            rto_lower = rto.lower()
-            
-            # Check if this RTO has been downloaded (using case-insensitive matching)
-            is_downloaded = False
-            matched_name = None
-            
-            # Check for exact match
-            if rto_lower in downloaded_rtos_lower:
-                is_downloaded = True
-            
-            # Check for partial matches if no exact match
-            if not is_downloaded:
-                for downloaded_rto in downloaded_rtos_lower:
-                    # If either contains the other, consider it a match
-                    if rto_lower in downloaded_rto or downloaded_rto in rto_lower:
-                        is_downloaded = True
-                        matched_name = downloaded_rto
-                        break
-            
-            # Write to the state sheet
-            state_sheet.cell(row=state_row, column=1, value=rto)
-            
-            if is_downloaded:
-                status_cell = state_sheet.cell(row=state_row, column=2, value="Downloaded")
-                status_cell.fill = downloaded_fill
-                if matched_name and matched_name != rto_lower:
-                    state_sheet.cell(row=state_row, column=3, value=f"Matched with: {downloaded_rtos[downloaded_rtos_lower.index(matched_name)]}")
+            match = downloaded_by_rto.get(rto)
+            if match is not None:
+                matched_name, how = match
+                note = f"Matched with: {matched_name}" if how != 'exact' else None
+                state_sheet.add_row(rto, ("Downloaded", 'downloaded'), note)
                 downloaded_count += 1
             else:
-                status_cell = state_sheet.cell(row=state_row, column=2, value="Missing")
-                status_cell.fill = missing_fill
-            
-            state_row += 1
+                state_sheet.add_row(rto, ("Missing", 'missing'), None)
         
         # Calculate completion percentage
         total_rtos = len(state_rtos)
         percentage = round((downloaded_count / total_rtos * 100), 2) if total_rtos > 0 else 0
         
         # Add to summary sheet
-        summary_sheet.cell(row=summary_row, column=1, value=state_name)
-        summary_sheet.cell(row=summary_row, column=2, value=total_rtos)
-        summary_sheet.cell(row=summary_row, column=3, value=downloaded_count)
-        summary_sheet.cell(row=summary_row, column=4, value=total_rtos - downloaded_count)
-        summary_sheet.cell(row=summary_row, column=5, value=f"{percentage}%")
-        
-        # Status column
-        status_cell = summary_sheet.cell(row=summary_row, column=6)
         if percentage == 100:
-            status_cell.value = f"Complete - All {total_rtos} RTOs downloaded"
-            status_cell.fill = complete_fill
+            status = (f"Complete - All {total_rtos} RTOs downloaded", 'complete')
         else:
-            status_cell.value = f"{total_rtos - downloaded_count} RTOs missing"
-            status_cell.fill = missing_fill
-        
-        summary_row += 1
-    
-    # Add a sheet for unmatched downloads
-    unmatched_sheet = wb.create_sheet(title="Unmatched Downloads")
-    unmatched_sheet.cell(row=1, column=1, value="Downloaded RTO Code")
-    unmatched_sheet.cell(row=1, column=2, value="Not Matched with Any Official RTO")
-    
-    # Find downloaded RTOs that didn't match with any official RTO
-    all_rtos_lower = [rto.lower() for rto in all_rtos]
-    unmatched_row = 2
-    
-    for downloaded_rto in downloaded_rtos:
-        if not downloaded_rto:
-            continue
-            
-        downloaded_lower = downloaded_rto.lower()
-        matched = False
-        
-        # Check exact and partial matches
-        for official_rto_lower in all_rtos_lower:
-            if downloaded_lower in official_rto_lower or official_rto_lower in downloaded_lower:
-                matched = True
-                break
-                
-        if not matched:
-            unmatched_sheet.cell(row=unmatched_row, column=1, value=downloaded_rto)
-            unmatched_sheet.cell(row=unmatched_row, column=2, value="Not matched with any official RTO")
-            unmatched_row += 1
-    
-    # Adjust column widths
-    for sheet in wb:
-        for col in sheet.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                if cell.value:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-            adjusted_width = (max_length + 2)
-            sheet.column_dimensions[column].width = min(adjusted_width, 50)  # Cap width at 50
-    
-    # Save the workbook
-    wb.save(REPORT_PATH)
-    print(f"Report saved to {REPORT_PATH}")
+            status = (f"{total_rtos - downloaded_count} RTOs missing", 'missing')
+        summary_sheet.add_row(state_name, total_rtos, downloaded_count, total_rtos - downloaded_count,
+                              f"{percentage}%", status)
+    
+    # Add a sheet for downloaded RTOs that didn't match with any official RTO
+    unmatched_sheet = ReportSheet("Unmatched Downloads", ["Downloaded RTO Code", "Not Matched with Any Official RTO"])
+    for downloaded_rto in unmatched_downloads:
+        unmatched_sheet.add_row(downloaded_rto, "Not matched with any official RTO")
+    
+    # Save the report
+    write_report([summary_sheet] + state_sheets + [unmatched_sheet], report_path)
+    print(f"Report saved to {report_path}")
 
 # ==============================================
 # Main Execution
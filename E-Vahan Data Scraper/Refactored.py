@@ -17,6 +17,10 @@ import argparse
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Utilities'))
+from debug_artifacts import DebugArtifactStore
+from file_names import sanitize_filename
+
 
 class VahanScraperConfig:
     """Configuration class for Vahan scraper settings."""
@@ -104,10 +108,16 @@ class VahanScraper:
         self.date_folder = os.path.join(self.config.download_path, self.current_date)
         os.makedirs(self.date_folder, exist_ok=True)
 
+        # Bounded, sampled store for screenshots and page sources
+        self.debug_store = DebugArtifactStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug"))
+
         # Progress tracking
         self.progress_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vahan_scraping_progress.json')
         self.progress = self._init_progress()
 
+        # Broken downloads reported by "Utilities/File Checker.py --watch" on this date folder
+        self.retry_queue_file = os.path.join(self.date_folder, 'retry_queue.jsonl')
+
         # State and RTO tracking
         self.current_state_index = self.progress.get('current_state_index', 0)
         self.current_rto_index = self.progress.get('current_rto_index', 0)
@@ -182,6 +192,9 @@ class VahanScraper:
         self.progress['current_state_index'] = self.current_state_index
         self.progress['current_rto_index'] = self.current_rto_index
         self.progress['j_idt_labels'] = self.j_idt_labels
+        # Lets coverage_service.py report per-state coverage without a browser
+        self.progress['states_ut'] = self.states_ut
+        self.progress['date_folder'] = self.date_folder
 
         try:
             with open(self.progress_file, 'w') as f:
@@ -303,14 +316,15 @@ class VahanScraper:
             # Save the detected labels to progress file
             self.save_progress()
 
-            # Debug information
-            self._save_debug_information()
+            # Page snapshot, read offline by Utilities/offline_j_idt.py
+            self._save_debug_information('j_idt_detection')
 
             logging.info("j_idt labels detection completed")
             return all(self.j_idt_labels.values())  # Return success only if all labels were found
 
         except Exception as e:
             logging.error(f"Error detecting j_idt labels: {e}")
+            self._save_debug_information('j_idt_detection', e)
             return False
 
     def _find_excel_export_button_alternatives(self) -> None:
@@ -339,24 +353,11 @@ class VahanScraper:
             except Exception as e:
                 logging.error(f"Error processing an image: {e}")
 
-    def _save_debug_information(self) -> None:
-        """Save screenshot and page source for debugging."""
-        debug_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug")
-        os.makedirs(debug_dir, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_path = os.path.join(debug_dir, f"vahan_dashboard_{timestamp}.png")
-        source_path = os.path.join(debug_dir, f"vahan_page_source_{timestamp}.html")
-
-        try:
-            self.driver.save_screenshot(screenshot_path)
-            logging.info(f"Saved screenshot to {screenshot_path}")
-
-            with open(source_path, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            logging.info(f"Saved page source to {source_path}")
-        except Exception as e:
-            logging.error(f"Error saving debug information: {e}")
+    def _save_debug_information(self, stage: str, error: Any = None, **context) -> None:
+        """Save screenshot and page source for debugging, subject to the debug store's sampling."""
+        if self.driver is None:
+            return
+        self.debug_store.capture(self.driver, stage, error, **context)
 
     def select_year(self, year: str = None) -> bool:
         """Select specific year from the year dropdown."""
@@ -451,12 +452,7 @@ class VahanScraper:
 
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize a filename by removing invalid characters."""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        filename = re.sub(r'\s*\([^)]*\)', '', filename)
-        filename = ' '.join(filename.split())
-        return filename.strip()
+        return sanitize_filename(filename)
 
     def wait_for_download_complete(self, timeout: int = None) -> bool:
         """Wait for download to complete."""
@@ -547,6 +543,7 @@ class VahanScraper:
 
         except Exception as e:
             logging.error(f"Error processing RTO {rto_text}: {e}")
+            self._save_debug_information('process_rto', e, state=state, rto=rto_text)
             return False
 
     def process_state(self, state: str) -> bool:
@@ -591,6 +588,9 @@ class VahanScraper:
                 # Process the RTO
                 if self.process_rto(rto_option, rto_text, state):
                     success_count += 1
+                    self._record_rto_result(state, rto_text, True)
+                else:
+                    self._record_rto_result(state, rto_text, False)
 
                 # Update progress after each RTO
                 self.current_rto_index = i + 1
@@ -607,6 +607,11 @@ class VahanScraper:
                     # Re-fetch the options if they might have changed
                     rto_options = self.driver.find_elements(By.CSS_SELECTOR, f"#{rto_dropdown_id}_items .ui-selectonemenu-item")
 
+            # Re-fetch exports the file checker found broken while this state was running
+            retries = self.take_retry_requests(state)
+            if retries:
+                success_count += self._retry_broken_downloads(state, retries, rto_dropdown_id)
+
             # Record state as completed if any RTOs were processed successfully
             if success_count > 0:
                 self.progress['completed_states'][state] = True
@@ -619,8 +624,86 @@ class VahanScraper:
 
         except Exception as e:
             logging.error(f"Error processing state {state}: {e}")
+            self._save_debug_information('process_state', e, state=state)
             return False
 
+    def take_retry_requests(self, state: str) -> Dict[str, str]:
+        """
+        Remove and return the retry queue entries for one state.
+
+        The queue is renamed before reading, so entries appended by the watcher in the
+        meantime go to a fresh file and are not lost.
+
+        Args:
+            state: State as shown in the dropdown
+
+        Returns:
+            Mapping of sanitized RTO name to the broken file
+        """
+        if not os.path.exists(self.retry_queue_file):
+            return {}
+
+        taking = self.retry_queue_file + '.processing'
+        try:
+            os.replace(self.retry_queue_file, taking)
+            with open(taking, 'r', encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            os.remove(taking)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading retry queue: {e}")
+            return {}
+
+        state_folder = self.sanitize_filename(state)
+        requests = {}
+        remaining = []
+        for entry in entries:
+            if entry.get('state') == state_folder:
+                # Name conflicts were saved as "<rto>_<n>.xlsx"
+                requests[re.sub(r'_\d+$', '', entry['rto'])] = entry['file']
+            else:
+                remaining.append(entry)
+
+        if remaining:
+            with open(self.retry_queue_file, 'a', encoding='utf-8') as f:
+                for entry in remaining:
+                    f.write(json.dumps(entry) + '\n')
+        return requests
+
+    def _retry_broken_downloads(self, state: str, retries: Dict[str, str], rto_dropdown_id: str) -> int:
+        """Download the queued RTOs of a state again, replacing the broken files."""
+        logging.info(f"Re-fetching {len(retries)} broken downloads for state: {state}")
+        fetched = 0
+        for rto_name, broken_file in retries.items():
+            trigger = self.wait.until(EC.element_to_be_clickable(
+                (By.CSS_SELECTOR, f"#{rto_dropdown_id} .ui-selectonemenu-trigger")
+            ))
+            self.driver.execute_script("arguments[0].click();", trigger)
+            time.sleep(0.5)
+
+            rto_options = self.driver.find_elements(By.CSS_SELECTOR, f"#{rto_dropdown_id}_items .ui-selectonemenu-item")
+            option = next((o for o in rto_options if self.sanitize_filename(o.text) == rto_name), None)
+            if option is None:
+                logging.warning(f"RTO {rto_name} from the retry queue not found in state: {state}")
+                continue
+
+            if os.path.exists(broken_file):
+                os.remove(broken_file)
+            rto_text = option.text
+            if self.process_rto(option, rto_text, state):
+                fetched += 1
+                self._record_rto_result(state, rto_text, True)
+            else:
+                self._record_rto_result(state, rto_text, False)
+        return fetched
+
+    def _record_rto_result(self, state: str, rto_text: str, success: bool) -> None:
+        """Keep the list of RTOs whose download failed in the progress file."""
+        failed = self.progress.setdefault('failed_rtos', {}).setdefault(state, [])
+        if success and rto_text in failed:
+            failed.remove(rto_text)
+        elif not success and rto_text not in failed:
+            failed.append(rto_text)
+
     def scrape_data(self) -> None:
         """Main scraping method."""
         try:
@@ -1,15 +1,296 @@
 import os
-import pandas as pd
+import csv
+import json
+import time
+import zipfile
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import iterparse
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # watch mode falls back to polling
+    INotify = None
 
 folder_path = r"F:\Flipcarbon\2025\3. March\11-03-2025\2025"
 
-for root, dirs, files in os.walk(folder_path):
-    for file in files:
-        file_path = os.path.join(root, file)
+# Parts every Excel export must contain
+REQUIRED_PARTS = ('[Content_Types].xml', 'xl/workbook.xml')
+
+CACHE_FILE = 'file_check_cache.json'
+
+# Failed downloads for the scraper to fetch again, one JSON object per line, kept in the watched folder
+RETRY_QUEUE = 'retry_queue.jsonl'
+
+# Refactored.py downloads into <download path>/<DD-MM-YYYY>/<state>/<rto>.xlsx and reads
+# the retry queue from that date folder, so --watch must be pointed at it
+DATE_FOLDER_FORMAT = '%d-%m-%Y'
+
+
+def check_xlsx(file_path):
+    """Validate an .xlsx without loading it: zip directory, required parts and sheet XML up to the title row"""
+    with zipfile.ZipFile(file_path) as zf:
+        names = set(zf.namelist())
+        missing = [part for part in REQUIRED_PARTS if part not in names]
+        if missing:
+            return f"missing parts: {', '.join(missing)}"
+        sheets = sorted(n for n in names if n.startswith('xl/worksheets/sheet') and n.endswith('.xml'))
+        if not sheets:
+            return "no worksheet in workbook"
+
+        # Parsing stops at the end of the first row, so only the head of the sheet is inflated
+        with zf.open(sheets[0]) as sheet:
+            for _, element in iterparse(sheet, events=('end',)):
+                if element.tag.endswith('}row'):
+                    if not len(element):
+                        return "title row is empty"
+                    break
+            else:
+                return "sheet has no rows"
+    return None
+
+
+def check_csv(file_path):
+    """Validate a .csv by decoding its header line"""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        if not f.readline().strip():
+            return "empty header line"
+    return None
+
+
+def check_file(file_path):
+    """Check one file; returns a result record with an error message, or None for error when it is fine"""
+    stat = os.stat(file_path)
+    result = {'file': file_path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'error': None}
+    try:
+        if stat.st_size == 0:
+            result['error'] = "empty file"
+        elif file_path.lower().endswith('.xlsx'):
+            result['error'] = check_xlsx(file_path)
+        elif file_path.lower().endswith('.csv'):
+            result['error'] = check_csv(file_path)
+    except Exception as e:  # BadZipFile, ParseError, UnicodeDecodeError, EOFError, ...
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['ok'] = result['error'] is None
+    return result
+
+
+def load_cache(cache_path):
+    """Previous results keyed by path"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(results, cache_path):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({r['file']: r for r in results}, f)
+
+
+def iter_files(folder):
+    """Yield every .xlsx and .csv below folder"""
+    for root, _, files in os.walk(folder):
+        for file in files:
+            if file.lower().endswith(('.xlsx', '.csv')) and not file.startswith('~$'):
+                yield os.path.join(root, file)
+
+
+def scan(folder, cache_path=CACHE_FILE, jobs=None):
+    """
+    Check every file under folder, re-checking only files whose size or mtime changed
+    since the cached result.
+
+    Returns:
+        list of result records, one per file
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    results, pending = [], []
+    for file_path in iter_files(folder):
+        cached = cache.get(file_path)
+        if cached is not None:
+            stat = os.stat(file_path)
+            if cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+                results.append(cached)
+                continue
+        pending.append(file_path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results.extend(executor.map(check_file, pending, chunksize=64))
+
+    if cache_path:
+        save_cache(results, cache_path)
+    print(f"Checked {len(results)} files ({len(pending)} new or changed, {len(results) - len(pending)} from cache)")
+    return results
+
+
+def write_report(results, report_path):
+    """Save results as .json or .csv, depending on the extension"""
+    if report_path.lower().endswith('.csv'):
+        with open(report_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['file', 'ok', 'error', 'size', 'mtime'])
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print(f"Report saved to {report_path}")
+
+
+def queue_retry(result, queue_path):
+    """Append a failed file to the retry queue with the state folder and RTO name the scraper saved it under"""
+    entry = {
+        'file': result['file'],
+        'state': os.path.basename(os.path.dirname(result['file'])),
+        'rto': os.path.splitext(os.path.basename(result['file']))[0],
+        'error': result['error'],
+        'time': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(queue_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def check_watch_root(folder):
+    """Raise ValueError unless folder is a scraper date folder, the one whose retry queue it reads"""
+    name = os.path.basename(os.path.normpath(folder))
+    try:
+        datetime.strptime(name, DATE_FOLDER_FORMAT)
+        return
+    except ValueError:
+        pass
+    dated = []
+    for entry in os.scandir(folder):
+        try:
+            dated.append((datetime.strptime(entry.name, DATE_FOLDER_FORMAT), entry.path))
+        except ValueError:
+            continue
+    hint = f"; the newest one here is {max(dated)[1]}" if dated else ""
+    raise ValueError(f"{folder} is not a scraper date folder (<download path>/DD-MM-YYYY){hint}")
+
+
+def _handle_new_file(file_path, folder, queue_path):
+    if not file_path.lower().endswith('.xlsx') or os.path.basename(file_path).startswith('~$'):
+        return
+    # Only <state>/<rto>.xlsx can be queued: a file directly in the date folder is still
+    # where the browser downloaded it and is checked once the scraper moves it into its
+    # state folder; anything deeper is not a file the scraper saved
+    if len(os.path.relpath(file_path, folder).split(os.sep)) != 2:
+        return
+    if not os.path.exists(file_path):
+        return  # already moved on, e.g. from the download folder into its state folder
+    result = check_file(file_path)
+    if result['ok']:
+        print(f"OK      {file_path}")
+    else:
+        print(f"BROKEN  {file_path}: {result['error']}")
+        queue_retry(result, queue_path)
+
+
+def _watch_inotify(folder, queue_path):
+    """Check each .xlsx as soon as it is closed after writing or moved into the tree"""
+    inotify = INotify()
+    watches = {}
+    dir_mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+
+    def add_tree(path):
+        for root, _, _ in os.walk(path):
+            watches[inotify.add_watch(root, dir_mask)] = root
+
+    add_tree(folder)
+    print(f"Watching {folder} with inotify ({len(watches)} folders)")
+    while True:
+        for event in inotify.read():
+            parent = watches.get(event.wd)
+            if parent is None or not event.name:
+                continue
+            path = os.path.join(parent, event.name)
+            if event.mask & flags.ISDIR:
+                # New state folders are watched too; files moved in with them are checked now
+                add_tree(path)
+                for root, _, files in os.walk(path):
+                    for file in files:
+                        _handle_new_file(os.path.join(root, file), folder, queue_path)
+            elif event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO):
+                _handle_new_file(path, folder, queue_path)
+
+
+def _watch_polling(folder, queue_path, interval):
+    """Check each new .xlsx once its size and mtime are unchanged between two polls"""
+    def snapshot():
+        stats = {}
+        for path in iter_files(folder):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    checked = snapshot()  # files present at start-up are left to a full scan
+    pending = {}
+    print(f"Watching {folder} by polling every {interval}s (install inotify_simple for instant checks)")
+    while True:
+        time.sleep(interval)
+        for path, signature in snapshot().items():
+            if checked.get(path) == signature:
+                continue
+            if pending.get(path) == signature:
+                del pending[path]
+                checked[path] = signature
+                _handle_new_file(path, folder, queue_path)
+            else:
+                pending[path] = signature
+
+
+def watch(folder, queue_path=None, interval=2.0):
+    """Validate exports as they land and queue broken ones for the scraper to re-fetch"""
+    check_watch_root(folder)
+    queue_path = queue_path or os.path.join(folder, RETRY_QUEUE)
+    print(f"Broken files are queued in {queue_path}")
+    try:
+        if INotify is not None:
+            _watch_inotify(folder, queue_path)
+        else:
+            _watch_polling(folder, queue_path, interval)
+    except KeyboardInterrupt:
+        print("Watch stopped")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check downloaded exports for broken files")
+
+    parser.add_argument("folder", nargs="?", default=folder_path, help="Folder to scan")
+    parser.add_argument("--report", type=str, default="file_check_report.json", help="Report file (.json or .csv)")
+    parser.add_argument("--cache", type=str, default=CACHE_FILE, help="Result cache file; empty string disables it")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--all", action="store_true", help="Include files that passed in the report")
+    parser.add_argument("--watch", action="store_true", help="Keep running and check each new .xlsx as it lands; folder must then be the "
+                             "scraper's date folder (<download path>/DD-MM-YYYY), where it reads the retry queue")
+    parser.add_argument("--queue", type=str, default=None, help=f"Retry queue file for --watch (default: <folder>/{RETRY_QUEUE})")
+    parser.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds when inotify is unavailable")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if args.watch:
         try:
-            if file.endswith(".xlsx"):
-                pd.read_excel(file_path)  # Try reading Excel files
-            elif file.endswith(".csv"):
-                pd.read_csv(file_path)  # Try reading CSV files
-        except Exception as e:
-            print(f"File {file_path} cannot be read: {e}")
+            watch(args.folder, args.queue, args.interval)
+        except ValueError as e:
+            print(f"Error: {e}")
+            raise SystemExit(1)
+        raise SystemExit
+
+    results = scan(args.folder, args.cache or None, args.jobs)
+    failures = [r for r in results if not r['ok']]
+    for r in failures:
+        print(f"File {r['file']} cannot be read: {r['error']}")
+    print(f"{len(failures)} of {len(results)} files failed")
+
+    write_report(results if args.all else failures, args.report)
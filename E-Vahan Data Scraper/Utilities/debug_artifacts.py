@@ -0,0 +1,240 @@
+import io
+import os
+import re
+import gzip
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+try:
+    from PIL import Image
+except ImportError:  # screenshots are then kept as the driver's PNG
+    Image = None
+
+INDEX_FILE = 'index.jsonl'
+
+
+def error_class(error):
+    """Short error label for the index: the exception type name, or the string given"""
+    if error is None:
+        return 'none'
+    if isinstance(error, BaseException):
+        return type(error).__name__
+    return str(error)
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', str(text)).strip('-')[:40] or 'x'
+
+
+class DebugArtifactStore:
+    """
+    Bounded store of failure screenshots and page sources, shared by the scrapers.
+
+    Each capture is indexed by run, stage and error class in index.jsonl. Per
+    (stage, error class) the first `always_keep` captures of a run are kept, later ones
+    only with probability `sample_rate` and never more often than every `min_interval`
+    seconds; skipped captures are counted on the next record that is kept. Page sources
+    are gzipped, screenshots re-encoded as JPEG when Pillow is available, and the oldest
+    artifacts are evicted once `max_bytes` or `max_artifacts` is exceeded.
+    """
+
+    def __init__(self, root, run_id=None, max_bytes=200 * 1024 * 1024, max_artifacts=500,
+                 sample_rate=0.1, always_keep=3, min_interval=60.0):
+        self.root = root
+        self.run_id = run_id or f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+        self.max_bytes = max_bytes
+        self.max_artifacts = max_artifacts
+        self.sample_rate = sample_rate
+        self.always_keep = always_keep
+        self.min_interval = min_interval
+        self.index_path = os.path.join(root, INDEX_FILE)
+        os.makedirs(root, exist_ok=True)
+
+        self.entries = self._load_index()
+        self._kept = {}        # (stage, error class) -> captures kept this run
+        self._last = {}        # (stage, error class) -> time of the last kept capture
+        self._suppressed = {}  # (stage, error class) -> captures skipped since the last kept one
+        self._lock = threading.Lock()
+
+    def _load_index(self):
+        entries = []
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def _should_keep(self, key):
+        kept = self._kept.get(key, 0)
+        # The first few of a run are always kept, even when they come in a burst
+        if kept < self.always_keep:
+            return True
+        if time.monotonic() - self._last[key] < self.min_interval:
+            return False
+        return random.random() < self.sample_rate
+
+    def capture(self, driver, stage, error=None, screenshot=True, page_source=True, **context):
+        """
+        Save a screenshot and page source of the driver's current page, if sampling allows.
+
+        Args:
+            driver: Selenium driver
+            stage: where the failure happened, e.g. 'search_page'
+            error: the exception, or a short label such as 'captcha'
+            context: extra fields stored in the index, e.g. company='Acme', page=2
+
+        Returns:
+            The index record, or None when the capture was skipped or failed
+        """
+        key = (stage, error_class(error))
+        with self._lock:
+            if not self._should_keep(key):
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return None
+            self._kept[key] = self._kept.get(key, 0) + 1
+            self._last[key] = time.monotonic()
+            suppressed = self._suppressed.pop(key, 0)
+
+        stamp = datetime.now()
+        base = f"{stamp:%Y%m%d_%H%M%S_%f}_{_slug(stage)}_{_slug(key[1])}"
+        files, size = [], 0
+        try:
+            if page_source:
+                path = os.path.join(self.root, base + '.html.gz')
+                with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                    f.write(driver.page_source)
+                files.append(os.path.basename(path))
+                size += os.path.getsize(path)
+            if screenshot:
+                png = driver.get_screenshot_as_png()
+                data, ext = self._compress_image(png)
+                path = os.path.join(self.root, base + ext)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                files.append(os.path.basename(path))
+                size += len(data)
+        except Exception as e:
+            logging.error(f"Could not capture debug artifacts for {stage}: {e}")
+            if not files:
+                return None
+
+        record = {
+            'time': stamp.isoformat(timespec='seconds'),
+            'run': self.run_id,
+            'stage': stage,
+            'error': key[1],
+            'message': str(error)[:500] if isinstance(error, BaseException) else None,
+            'files': files,
+            'bytes': size,
+            'suppressed': suppressed,
+        }
+        if context:
+            record['context'] = context
+
+        with self._lock:
+            self.entries.append(record)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            self._evict()
+        logging.info(f"Saved debug artifacts for {stage} ({key[1]}): {', '.join(files)}")
+        return record
+
+    def _compress_image(self, png):
+        if Image is None:
+            return png, '.png'
+        image = Image.open(io.BytesIO(png)).convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=60, optimize=True)
+        return buffer.getvalue(), '.jpg'
+
+    def _evict(self):
+        """Drop the oldest artifacts until the store is within its limits"""
+        total = sum(e['bytes'] for e in self.entries)
+        dropped = 0
+        while self.entries and (len(self.entries) > self.max_artifacts or total > self.max_bytes):
+            oldest = self.entries.pop(0)
+            total -= oldest['bytes']
+            dropped += 1
+            for name in oldest['files']:
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+        if dropped:
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(e) + '\n' for e in self.entries)
+            os.replace(tmp, self.index_path)
+
+    def find(self, run=None, stage=None, error=None):
+        """Index records matching every filter given, oldest first"""
+        return [e for e in self.entries
+                if (run is None or e['run'] == run)
+                and (stage is None or e['stage'] == stage)
+                and (error is None or e['error'] == error)]
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+
+def read_artifact(path):
+    """Contents of a stored artifact, decompressing page sources"""
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="List and extract saved scraper debug artifacts")
+
+    parser.add_argument("root", help="Artifact folder, e.g. 'E-Vahan Data Scraper/debug'")
+    parser.add_argument("--run", type=str, default=None, help="Only this run")
+    parser.add_argument("--stage", type=str, default=None, help="Only this stage")
+    parser.add_argument("--error", type=str, default=None, help="Only this error class")
+    parser.add_argument("--summary", action="store_true", help="Count artifacts by stage and error class")
+    parser.add_argument("--extract", type=str, default=None, metavar="FOLDER",
+                        help="Write the matching artifacts, decompressed, to this folder")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    store = DebugArtifactStore(args.root, run_id='cli')
+    entries = store.find(args.run, args.stage, args.error)
+
+    if args.summary:
+        counts = {}
+        for e in entries:
+            key = (e['stage'], e['error'])
+            kept, skipped = counts.get(key, (0, 0))
+            counts[key] = (kept + 1, skipped + e.get('suppressed', 0))
+        print(f"{'Stage':<30} {'Error':<30} {'Kept':>6} {'Skipped':>8}")
+        for (stage, error), (kept, skipped) in sorted(counts.items()):
+            print(f"{stage:<30} {error:<30} {kept:>6} {skipped:>8}")
+    else:
+        for e in entries:
+            print(f"{e['time']}  {e['run']}  {e['stage']:<25} {e['error']:<25} {e['bytes'] / 1024:8.1f} KB  {' '.join(e['files'])}")
+    print(f"{len(entries)} artifacts, {sum(e['bytes'] for e in entries) / 1024 / 1024:.1f} MB")
+
+    if args.extract:
+        os.makedirs(args.extract, exist_ok=True)
+        for e in entries:
+            for name in e['files']:
+                target = os.path.join(args.extract, name[:-3] if name.endswith('.gz') else name)
+                with open(target, 'wb') as f:
+                    f.write(read_artifact(store.path(name)))
+        print(f"Extracted to {args.extract}")
@@ -0,0 +1,18 @@
+import re
+
+INVALID_CHARS = '<>:"/\\|?*'
+
+
+def sanitize_filename(filename: str) -> str:
+    """
+    Name the scraper gives a state folder or RTO file: invalid characters replaced,
+    bracketed counts such as '(48)' dropped and whitespace collapsed.
+
+    Shared by Refactored.py, which names the downloads, and coverage_service.py, which
+    looks for them.
+    """
+    for char in INVALID_CHARS:
+        filename = filename.replace(char, '_')
+    filename = re.sub(r'\s*\([^)]*\)', '', filename)
+    filename = ' '.join(filename.split())
+    return filename.strip()
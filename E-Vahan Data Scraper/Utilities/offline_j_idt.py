@@ -0,0 +1,172 @@
+import os
+import re
+import sys
+import glob
+import json
+import argparse
+from lxml import html
+from debug_artifacts import INDEX_FILE, read_artifact
+
+# Where VahanScraper._save_debug_information writes its snapshots
+DEBUG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'debug')
+# Plain page sources saved by older versions of the scraper
+SNAPSHOT_PATTERN = 'vahan_page_source_*.html'
+# Debug store stage of the snapshot taken after label detection
+SNAPSHOT_STAGE = 'j_idt_detection'
+
+LABEL_KEYS = ('state_dropdown_j_idt', 'refresh_button_j_idt', 'excel_img_j_idt')
+
+# The same lookups, in the same order, as VahanScraper.detect_j_idt_labels
+STATE_XPATHS = [
+    "//label[contains(@id, 'j_idt') and contains(@class, 'ui-selectonemenu-label') and contains(text(), 'All Vahan4 Running States')]",
+]
+REFRESH_XPATHS = [
+    "//button[contains(@id, 'j_idt') and .//span[text()='Refresh']]",
+    "//button[contains(@id, 'j_idt')]/span[contains(@class, 'ui-icon-refresh')]/..",
+]
+EXCEL_XPATHS = [
+    "//img[contains(@id, 'groupingTable:j_idt')]",
+    "//img[contains(@id, 'j_idt') and (contains(@src, 'csv.png') or contains(@title, 'Excel') or contains(@title, 'EXCEL'))]",
+]
+
+
+def extract_j_idt_from_id(id_value):
+    """Extract j_idt label from an ID attribute."""
+    match = re.search(r'j_idt\d+', id_value or '')
+    return match.group(0) if match else None
+
+
+def _first_id(tree, xpaths):
+    for xpath in xpaths:
+        found = tree.xpath(xpath)
+        if found:
+            return found[0].get('id')
+    return None
+
+
+def extract_labels(source):
+    """
+    The j_idt label map VahanScraper stores in its progress file, from page source.
+
+    Args:
+        source: HTML text or bytes
+
+    Returns:
+        dict with LABEL_KEYS; a value is None when the element is not in the page
+    """
+    tree = html.fromstring(source)
+    labels = dict.fromkeys(LABEL_KEYS)
+
+    state_id = _first_id(tree, STATE_XPATHS)
+    if state_id is None:
+        # Fallback: the third select menu on the page
+        selects = tree.xpath("//div[contains(@class, 'ui-selectonemenu')]")
+        if len(selects) >= 3:
+            state_id = selects[2].get('id')
+    labels['state_dropdown_j_idt'] = extract_j_idt_from_id(state_id)
+    labels['refresh_button_j_idt'] = extract_j_idt_from_id(_first_id(tree, REFRESH_XPATHS))
+
+    # The scraper keeps the full id of the export image, e.g. groupingTable:j_idt76
+    excel_id = _first_id(tree, EXCEL_XPATHS)
+    if excel_id is None:
+        for img in tree.iter('img'):
+            img_id = img.get('id') or ''
+            hints = f"{img.get('src') or ''} {img.get('title') or ''}".lower()
+            if 'j_idt' in img_id and any(word in hints for word in ('csv', 'excel', 'download')):
+                excel_id = img_id
+                break
+    labels['excel_img_j_idt'] = excel_id
+    return labels
+
+
+def extract_from_file(path):
+    return extract_labels(read_artifact(path))
+
+
+def diff_labels(previous, current):
+    """{key: (previous, current)} for every label that changed"""
+    return {key: (previous.get(key), current.get(key))
+            for key in LABEL_KEYS if previous.get(key) != current.get(key)}
+
+
+def snapshots(folder):
+    """Saved page sources in folder, oldest first"""
+    # (YYYYmmdd_HHMMSS timestamp, path) for both the old files and the debug store
+    found = [(os.path.basename(p)[len('vahan_page_source_'):-len('.html')], p)
+             for p in glob.glob(os.path.join(folder, SNAPSHOT_PATTERN))]
+    index_path = os.path.join(folder, INDEX_FILE)
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('stage') != SNAPSHOT_STAGE or entry.get('error') != 'none':
+                    continue
+                for name in entry['files']:
+                    if name.endswith('.html.gz'):
+                        found.append((name[:15], os.path.join(folder, name)))
+    return [path for _, path in sorted(found)]
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Extract the Vahan j_idt labels from saved page sources, without a browser")
+
+    parser.add_argument("source", nargs="?", default=DEBUG_DIR,
+                        help="Page source (.html or .html.gz), or the scraper's debug folder (newest snapshot is used)")
+    parser.add_argument("--previous", type=str, default=None,
+                        help="Page source or label map .json to diff against (default: the snapshot before the newest)")
+    parser.add_argument("--save", type=str, default=None, help="Write the extracted label map to this .json")
+    parser.add_argument("--json", action="store_true", help="Print the label map and diff as JSON")
+
+    return parser.parse_args()
+
+
+def _load_map(path):
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # A scraper progress file keeps the map under 'j_idt_labels'
+        return data.get('j_idt_labels', data)
+    return extract_from_file(path)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    previous_path = args.previous
+    if os.path.isdir(args.source):
+        found = snapshots(args.source)
+        if not found:
+            print(f"No saved page sources in {args.source}")
+            sys.exit(2)
+        current_path = found[-1]
+        if previous_path is None and len(found) > 1:
+            previous_path = found[-2]
+    else:
+        current_path = args.source
+
+    labels = extract_from_file(current_path)
+    changes = diff_labels(_load_map(previous_path), labels) if previous_path else {}
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(labels, f, indent=2)
+
+    if args.json:
+        print(json.dumps({'source': current_path, 'previous': previous_path, 'labels': labels,
+                          'changed': {k: {'previous': p, 'current': c} for k, (p, c) in changes.items()}}, indent=2))
+    else:
+        print(f"Extracted J_IDT Labels ({os.path.basename(current_path)}):")
+        for key in LABEL_KEYS:
+            print(f"  {key} = {labels[key]!r}")
+        if previous_path:
+            print(f"Compared with {os.path.basename(previous_path)}: "
+                  + ("no changes" if not changes else f"{len(changes)} label(s) changed"))
+            for key, (old, new) in changes.items():
+                print(f"  {key}: {old!r} -> {new!r}")
+
+    # Non-zero when a label is missing or drifted, for scheduled checks
+    sys.exit(1 if changes or not all(labels.values()) else 0)
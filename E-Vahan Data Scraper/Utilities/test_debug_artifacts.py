@@ -0,0 +1,21 @@
+from debug_artifacts import DebugArtifactStore
+
+
+class FakeDriver:
+    page_source = '<html><body>captcha</body></html>'
+
+    def get_screenshot_as_png(self):
+        return b'\x89PNG fake'
+
+
+def test_burst_keeps_always_keep_captures_then_counts_the_rest(tmp_path):
+    store = DebugArtifactStore(str(tmp_path), always_keep=3, sample_rate=1.0, min_interval=60)
+    driver = FakeDriver()
+
+    records = [store.capture(driver, 'search_page', 'captcha') for _ in range(10)]
+
+    kept = [r for r in records if r]
+    assert len(kept) == 3
+    assert records[:3] == kept
+    assert store.capture(driver, 'search_page', 'timeout') is not None
+    assert store._suppressed[('search_page', 'captcha')] == 7
@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import html
+import zipfile
+from functools import lru_cache
+from xml.etree.ElementTree import iterparse
+
+# First cell element of a sheet, with or without a namespace prefix
+_CELL = re.compile(rb'<(?:\w+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)', re.S)
+_ATTR = re.compile(rb'\b(r|t)="([^"]*)"')
+_VALUE = re.compile(rb'<(?:\w+:)?v>([^<]*)</(?:\w+:)?v>')
+_INLINE_TEXT = re.compile(rb'<(?:\w+:)?t(?:\s[^>]*)?>([^<]*)</(?:\w+:)?t>')
+
+# Bytes of sheet XML inflated at a time while looking for the first cell
+_CHUNK = 16 * 1024
+
+# path -> (size, mtime_ns, title), filled by load_cache() and read_title()
+_DISK_CACHE = {}
+
+
+def _first_sheet(zf):
+    names = zf.namelist()
+    if 'xl/worksheets/sheet1.xml' in names:
+        return 'xl/worksheets/sheet1.xml'
+    sheets = sorted(n for n in names if n.startswith('xl/worksheets/sheet') and n.endswith('.xml'))
+    if not sheets:
+        raise KeyError("no worksheet in workbook")
+    return sheets[0]
+
+
+def _first_cell(zf, sheet):
+    """Inflate the sheet only until its first <c> element is complete"""
+    buffer = b''
+    with zf.open(sheet) as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            buffer += chunk
+            match = _CELL.search(buffer)
+            if match:
+                return match
+            if not chunk:
+                return None
+
+
+def _shared_string(zf, index):
+    """The index-th shared string, parsed incrementally and stopped as soon as it is reached"""
+    with zf.open('xl/sharedStrings.xml') as f:
+        position = 0
+        for _, element in iterparse(f, events=('end',)):
+            if not element.tag.endswith('}si'):
+                continue
+            if position == index:
+                # Plain <t> or rich-text runs <r><t>; phonetic <rPh> runs are not part of the value
+                parts = []
+                for child in element:
+                    if child.tag.endswith('}t'):
+                        parts.append(child.text or '')
+                    elif child.tag.endswith('}r'):
+                        parts.extend(t.text or '' for t in child if t.tag.endswith('}t'))
+                return ''.join(parts)
+            position += 1
+            element.clear()
+    raise IndexError(f"shared string {index} not found")
+
+
+def read_first_cell(file_path):
+    """
+    Value of cell A1 of the first sheet, read straight from the zip without openpyxl.
+
+    Only the head of the sheet XML is inflated, and sharedStrings.xml only up to the
+    referenced entry. Returns "" when A1 is empty.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        match = _first_cell(zf, _first_sheet(zf))
+        if match is None:
+            return ""
+        attrs = {k.decode(): v.decode() for k, v in _ATTR.findall(match.group(1))}
+        # The first cell written is not A1, so A1 is empty
+        if attrs.get('r', 'A1').upper() != 'A1':
+            return ""
+        body = match.group(2) or b''
+        cell_type = attrs.get('t', 'n')
+
+        if cell_type == 'inlineStr':
+            return html.unescape(b''.join(_INLINE_TEXT.findall(body)).decode('utf-8'))
+        value = _VALUE.search(body)
+        if value is None:
+            return ""
+        text = html.unescape(value.group(1).decode('utf-8'))
+        if cell_type == 's':
+            return _shared_string(zf, int(text))
+        return text
+
+
+@lru_cache(maxsize=65536)
+def _cached_title(file_path, size, mtime_ns):
+    return read_first_cell(file_path)
+
+
+def read_title(file_path):
+    """
+    Cell A1 of an export, cached in memory (and on disk after load_cache) by path, size and mtime.
+
+    Raises the underlying error (zipfile.BadZipFile, KeyError, ...) for unreadable files;
+    failures are not cached.
+    """
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    cached = _DISK_CACHE.get(file_path)
+    if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    title = _cached_title(file_path, stat.st_size, stat.st_mtime_ns)
+    _DISK_CACHE[file_path] = (stat.st_size, stat.st_mtime_ns, title)
+    return title
+
+
+def cache_entry(file_path):
+    """The cached (size, mtime_ns, title) for a file, for handing back from a worker process"""
+    return _DISK_CACHE.get(os.path.abspath(file_path))
+
+
+def update_cache(entries):
+    """Merge {path: (size, mtime_ns, title)} entries gathered by worker processes"""
+    _DISK_CACHE.update(entries)
+
+
+def load_cache(cache_path):
+    """Load titles saved by an earlier run"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            _DISK_CACHE.update({path: tuple(entry) for path, entry in json.load(f).items()})
+    except (OSError, ValueError):
+        pass
+
+
+def save_cache(cache_path):
+    """Persist every title read so far, so the next run only opens new or changed files"""
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(_DISK_CACHE, f)
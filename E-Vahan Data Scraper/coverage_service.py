@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import time
+import argparse
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Same folder naming as the scraper, in E-Vahan Data Scraper/Utilities
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Utilities'))
+from file_names import sanitize_filename
+
+# Written by Refactored.py next to itself
+PROGRESS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vahan_scraping_progress.json')
+
+# Written into the date folder by "Utilities/File Checker.py --watch"
+RETRY_QUEUE = 'retry_queue.jsonl'
+
+COLUMNS = ['State', 'Expected', 'Downloaded', 'Missing', 'Failed', 'Broken', 'Status']
+
+
+def expected_rtos(state):
+    """RTO count carried in the dropdown label, e.g. 'Bihar(48)' -> 48"""
+    match = re.search(r'\((\d+)\)\s*$', state)
+    return int(match.group(1)) if match else None
+
+
+class CoverageTracker:
+    """
+    Per-state coverage from the scraper's progress file and the files on disk.
+
+    Nothing is re-read unless it changed: the progress file and retry queue are reloaded
+    when their mtime moves, and a state folder is listed again only when its own mtime
+    does (creating, renaming or deleting a file in it updates that).
+    """
+
+    def __init__(self, progress_file=PROGRESS_FILE, date_folder=None):
+        self.progress_file = progress_file
+        self.date_folder = date_folder
+        self.progress = {}
+        self._progress_mtime = None
+        self._queue_mtime = None
+        self._broken = {}
+        # folder name -> (folder mtime, set of RTO names with a file)
+        self._files = {}
+        self.lock = threading.Lock()
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_progress(self):
+        mtime = self._mtime(self.progress_file)
+        if mtime is None or mtime == self._progress_mtime:
+            return
+        try:
+            with open(self.progress_file, 'r') as f:
+                self.progress = json.load(f)
+            self._progress_mtime = mtime
+        except ValueError:
+            pass  # caught mid-write; the next refresh picks it up
+
+    def _load_queue(self, folder):
+        path = os.path.join(folder, RETRY_QUEUE)
+        mtime = self._mtime(path)
+        if mtime == self._queue_mtime:
+            return
+        self._queue_mtime = mtime
+        self._broken = {}
+        if mtime is None:
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._broken.setdefault(entry.get('state'), set()).add(re.sub(r'_\d+$', '', entry.get('rto', '')))
+
+    def _downloaded(self, folder, name):
+        path = os.path.join(folder, name)
+        mtime = self._mtime(path)
+        cached = self._files.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        rtos = set()
+        if mtime is not None:
+            for entry in os.scandir(path):
+                if entry.name.lower().endswith('.xlsx') and not entry.name.startswith('~$'):
+                    # Name conflicts are saved as "<rto>_<n>.xlsx"
+                    rtos.add(re.sub(r'_\d+$', '', os.path.splitext(entry.name)[0]))
+        self._files[name] = (mtime, rtos)
+        return rtos
+
+    def refresh(self):
+        """Return the current coverage rows, one per state"""
+        with self.lock:
+            self._load_progress()
+            folder = self.date_folder or self.progress.get('date_folder')
+            if not folder:
+                raise ValueError("No date folder: pass one or run the scraper once to record it")
+            self._load_queue(folder)
+
+            states = self.progress.get('states_ut')
+            if not states:
+                # Older progress files: fall back to the state folders present
+                states = sorted(e.name for e in os.scandir(folder) if e.is_dir()) if os.path.isdir(folder) else []
+            completed = self.progress.get('completed_states', {})
+            failed = self.progress.get('failed_rtos', {})
+            current = self.progress.get('current_state_index', 0)
+
+            rows = []
+            for idx, state in enumerate(states):
+                name = sanitize_filename(state)
+                broken = self._broken.get(name, set())
+                downloaded = len(self._downloaded(folder, name) - broken)
+                expected = expected_rtos(state)
+                missing = max(expected - downloaded, 0) if expected is not None else None
+
+                if completed.get(state):
+                    status = 'complete' if not missing else 'done with gaps'
+                elif idx == current:
+                    status = 'in progress'
+                else:
+                    status = 'pending'
+
+                rows.append({
+                    'State': name,
+                    'Expected': expected,
+                    'Downloaded': downloaded,
+                    'Missing': missing,
+                    'Failed': len(failed.get(state, [])),
+                    'Broken': len(broken),
+                    'Status': status,
+                })
+            return rows
+
+    def snapshot(self):
+        """Coverage as a JSON-serialisable dict"""
+        rows = self.refresh()
+        totals = {col: sum(r[col] or 0 for r in rows) for col in ['Expected', 'Downloaded', 'Missing', 'Failed', 'Broken']}
+        return {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'date_folder': self.date_folder or self.progress.get('date_folder'),
+            'totals': totals,
+            'states': rows,
+            'failed_rtos': self.progress.get('failed_rtos', {}),
+        }
+
+
+def format_table(snapshot):
+    """Plain-text table of a snapshot"""
+    widths = [max(len(c), 12) if c == 'State' else len(c) for c in COLUMNS]
+    widths[0] = max([widths[0]] + [len(r['State']) for r in snapshot['states']])
+    lines = [' | '.join(c.ljust(w) for c, w in zip(COLUMNS, widths))]
+    lines.append('-+-'.join('-' * w for w in widths))
+    for row in snapshot['states'] + [dict(snapshot['totals'], State='TOTAL', Status='')]:
+        lines.append(' | '.join(
+            ('' if row[c] is None else str(row[c])).ljust(w) if c in ('State', 'Status')
+            else ('' if row[c] is None else str(row[c])).rjust(w)
+            for c, w in zip(COLUMNS, widths)
+        ))
+    return '\n'.join(lines)
+
+
+def make_handler(tracker):
+    class CoverageHandler(BaseHTTPRequestHandler):
+        """GET /coverage for JSON, anything else for the plain-text table"""
+
+        def do_GET(self):
+            try:
+                snapshot = tracker.snapshot()
+            except Exception as e:
+                self._send(500, 'text/plain', f"Error: {e}")
+                return
+            if self.path.rstrip('/') == '/coverage':
+                self._send(200, 'application/json', json.dumps(snapshot, indent=2))
+            else:
+                self._send(200, 'text/plain; charset=utf-8', format_table(snapshot))
+
+        def _send(self, code, content_type, body):
+            data = body.encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # keep the console for the table
+
+    return CoverageHandler
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Live per-state download coverage for the Vahan scraper")
+
+    parser.add_argument("--progress", type=str, default=PROGRESS_FILE, help="Scraper progress file")
+    parser.add_argument("--folder", type=str, default=None,
+                        help="Date folder with the state folders (default: the one recorded in the progress file)")
+    parser.add_argument("--watch", type=float, default=None, help="Reprint the table every N seconds")
+    parser.add_argument("--serve", type=int, default=None, metavar="PORT",
+                        help="Serve the table on http://127.0.0.1:PORT/ and JSON on /coverage")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of the table")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    tracker = CoverageTracker(args.progress, args.folder)
+
+    if args.serve:
+        server = ThreadingHTTPServer(('127.0.0.1', args.serve), make_handler(tracker))
+        print(f"Coverage at http://127.0.0.1:{args.serve}/ (JSON: /coverage)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        try:
+            while True:
+                snapshot = tracker.snapshot()
+                print(json.dumps(snapshot, indent=2) if args.json else format_table(snapshot))
+                if not args.watch:
+                    break
+                time.sleep(args.watch)
+                print()
+        except KeyboardInterrupt:
+            pass
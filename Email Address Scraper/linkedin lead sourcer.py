@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import random
 import logging
@@ -13,6 +14,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
+# Shared bounded store for failure screenshots and page sources
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'E-Vahan Data Scraper', 'Utilities'))
+from debug_artifacts import DebugArtifactStore
+# Profile index shared with the Linkedin scrapers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Linkedin'))
+from profile_index import ProfileIndex, canonical_linkedin_url
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +40,9 @@ class LinkedInScraper:
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
         ]
+        self.profile_index = ProfileIndex()
+        self.unsaved_urls = []  # Written to the index once they are in the saved workbook
+        self.debug_store = DebugArtifactStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug"))
         self.setup_driver()
         self.setup_stealth()
 
@@ -132,6 +143,7 @@ class LinkedInScraper:
     def get_linkedin_profiles_from_search_results(self, company):
         """Extract LinkedIn URLs and names from first 3 pages of Google search results"""
         linkedin_profiles = []
+        found_urls = set()
         page_number = 0
         max_pages = 3
 
@@ -177,8 +189,14 @@ class LinkedInScraper:
 
                         logging.info(f"Extracted URL: {actual_url}")
 
-                        if 'linkedin.com/in/' in actual_url.lower():
-                            linkedin_url = actual_url
+                        linkedin_url = canonical_linkedin_url(actual_url)
+                        if linkedin_url and '/in/' in linkedin_url:
+                            if linkedin_url in found_urls:
+                                continue
+                            found_urls.add(linkedin_url)
+                            if linkedin_url in self.profile_index:
+                                logging.info(f"Skipping LinkedIn URL collected before: {linkedin_url}")
+                                continue
                             logging.info(f"Found LinkedIn URL: {linkedin_url}")
 
                             # Extract Full Name from result.text (before " - LinkedIn")
@@ -222,10 +240,7 @@ class LinkedInScraper:
                 break # Timeout, stop pagination
             except Exception as e:
                 logging.error(f"Search/Pagination error on page {page_number+1}: {str(e)}")
-                timestamp = time.strftime("%Y%m%d-%H%M%S")
-                self.driver.save_screenshot(f"error_page_{page_number+1}_{company}_{timestamp}.png")
-                with open(f"page_source_page_{page_number+1}_{company}_{timestamp}.html", "w", encoding="utf-8") as f:
-                    f.write(self.driver.page_source)
+                self.debug_store.capture(self.driver, 'search_page', e, company=company, page=page_number + 1)
                 break # Stop pagination on general error
 
             page_number += 1
@@ -263,11 +278,14 @@ class LinkedInScraper:
                 self.search_google(query)
                 linkedin_profiles = self.get_linkedin_profiles_from_search_results(company) # Get list of profiles
 
-                for i, profile in enumerate(linkedin_profiles):
-                    if i < 15: # Limit to 15 profiles max (5 per page * 3 pages)
-                        self.df.at[index, f'LinkedIn URL {i+1}'] = profile['linkedin_url']
-                        self.df.at[index, f'Full Name {i+1}'] = profile['full_name']
-                        logging.info(f"  Profile {i+1}: LinkedIn URL - {profile['linkedin_url']}, Full Name - {profile['full_name']}")
+                # New profiles go into the free slots, after any found by an earlier run
+                free_slots = [i for i in range(1, 16)
+                              if pd.isna(self.df.at[index, f'LinkedIn URL {i}']) or self.df.at[index, f'LinkedIn URL {i}'] == '']
+                for slot, profile in zip(free_slots, linkedin_profiles): # Limit to 15 profiles max (5 per page * 3 pages)
+                    self.df.at[index, f'LinkedIn URL {slot}'] = profile['linkedin_url']
+                    self.df.at[index, f'Full Name {slot}'] = profile['full_name']
+                    self.unsaved_urls.append(profile['linkedin_url'])
+                    logging.info(f"  Profile {slot}: LinkedIn URL - {profile['linkedin_url']}, Full Name - {profile['full_name']}")
 
                 if not linkedin_profiles:
                     logging.warning(f"No LinkedIn results found for {company} in first 3 pages.")
@@ -298,6 +316,10 @@ class LinkedInScraper:
             self.df.to_excel(backup_path, index=False)
             self.df.to_excel(self.excel_path, index=False)
             logging.info("Progress saved to primary and backup files")
+            if self.unsaved_urls:
+                new = self.profile_index.add_many(self.unsaved_urls, source='lead sourcer')
+                logging.info(f"{new} profiles added to the shared index ({len(self.profile_index)} total)")
+                self.unsaved_urls = []
         except Exception as e:
             logging.error(f"Save error: {str(e)}")
 
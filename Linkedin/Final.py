@@ -10,18 +10,28 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 # Use undetected_chromedriver consistently
 import undetected_chromedriver as uc
-# Need this to parse the Google redirect URL
-from urllib.parse import urlparse, parse_qs, unquote
 from fake_useragent import UserAgent
 from typing import List, Dict, Optional
 import traceback # For detailed errors if needed
+import os
+import sys
+from serp_parser import parse_results
+from profile_index import canonical_linkedin_url
+from lead_store import LeadStore
+# Shared bounded store for failure screenshots and page sources
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'E-Vahan Data Scraper', 'Utilities'))
+from debug_artifacts import DebugArtifactStore
 
 class LinkedInScraper:
     def __init__(self):
         self.driver: Optional[uc.Chrome] = None
         self.data: List[Dict] = []
+        self.max_profiles = 50
+        self.query = None
+        self.lead_store = LeadStore()  # profiles collected by any run, shared with the other scrapers
         self.ua = UserAgent()
         self.window_sizes = [(1366, 768), (1440, 900), (1536, 864), (1920, 1080)]
+        self.debug_store = DebugArtifactStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug"))
 
     def setup_driver(self) -> uc.Chrome:
         """Sets up undetected_chromedriver, letting it auto-detect the version."""
@@ -102,85 +112,18 @@ class LinkedInScraper:
 
         except Exception as e:
             print(f"Failed during search navigation/input: {str(e)}")
-            try: self.driver.save_screenshot('error_search_page.png')
-            except: pass
+            self.debug_store.capture(self.driver, 'search_page', e, query=query)
             raise
 
     def extract_profile_data(self, result_element):
         """
         Extracts core data from a single Google search result block,
-        targeting the structure shown in the example HTML.
+        parsing its HTML in one round trip (see serp_parser).
         """
-        entry = {'Name': None, 'Title': None, 'Company_Name': None, 'LinkedIn_URL': None}
         try:
-            link_element = None
-            google_href = None
-            try:
-                link_element = WebDriverWait(result_element, 2).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.zReHs")) # Specific link class from example
-                )
-            except (TimeoutException, NoSuchElementException):
-                 try: # Fallback 1: Common structure
-                      link_element = WebDriverWait(result_element, 1).until(
-                           EC.presence_of_element_located((By.CSS_SELECTOR, "div.yuRUbf > a"))
-                      )
-                 except (TimeoutException, NoSuchElementException):
-                      try: # Fallback 2: Any link within the block
-                           link_element = result_element.find_element(By.TAG_NAME, "a")
-                      except NoSuchElementException:
-                           return None # No link found
-
-            google_href = link_element.get_attribute('href')
-            if not google_href: return None
-
-            try:
-                parsed_url = urlparse(google_href)
-                query_params = parse_qs(parsed_url.query)
-                actual_urls = query_params.get('url', [])
-                if actual_urls:
-                    entry['LinkedIn_URL'] = unquote(actual_urls[0])
-                elif 'linkedin.com/in/' in google_href or 'linkedin.com/pub/' in google_href: # Check if href is direct URL
-                     entry['LinkedIn_URL'] = google_href
-                else: return None
-
-                if not entry['LinkedIn_URL'] or not ('linkedin.com/in/' in entry['LinkedIn_URL'] or 'linkedin.com/pub/' in entry['LinkedIn_URL']):
-                    return None
-            except Exception: return None # Error during URL parsing
-
-            full_title = None
-            try:
-                title_element = link_element.find_element(By.CSS_SELECTOR, "h3.LC20lb") # Specific class from example
-                full_title = title_element.text.strip()
-            except NoSuchElementException:
-                 try: # Fallback to generic H3
-                      title_element = link_element.find_element(By.TAG_NAME, "h3")
-                      full_title = title_element.text.strip()
-                 except NoSuchElementException: pass
-
-            if full_title:
-                parts = full_title.split(' - ', 1)
-                entry['Name'] = parts[0].strip()
-                if len(parts) > 1:
-                    title_company_part = parts[1]
-                    title_company_split = title_company_part.split(' - ', 1)
-                    entry['Title'] = title_company_split[0].strip()
-                    if len(title_company_split) > 1:
-                        entry['Company_Name'] = title_company_split[1].replace('...', '').strip()
-                    else: entry['Title'] = title_company_part.strip() # Whole part is title if no second hyphen
-                else: entry['Name'] = full_title # Assume whole H3 is Name if no hyphen
-
-            # Fallback name extraction from URL
-            if not entry['Name'] and entry['LinkedIn_URL']:
-                 url_name_match = re.search(r'/in/([\w-]+)', entry['LinkedIn_URL'])
-                 if url_name_match:
-                     name_from_url = url_name_match.group(1).replace('-', ' ').title()
-                     entry['Name'] = re.sub(r'\s+\w*\d+\w*$', '', name_from_url).strip()
-
-            # Commented out verbose print for cleaner output during run
-            # print(f"  + Extracted: Name='{entry.get('Name')}', Title='{entry.get('Title')}', Company='{entry.get('Company_Name')}', URL='{entry.get('LinkedIn_URL')}'")
-            return entry
+            entries = parse_results(result_element.get_attribute('outerHTML'))
+            return entries[0] if entries else None
         except Exception:
-            # print(f"  - Error processing result block: {e}") # Keep minimal output
             return None
 
     def process_results_page(self):
@@ -192,47 +135,46 @@ class LinkedInScraper:
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'div#search'))
             )
 
-            result_blocks = []
-            try:
-                 # Prioritize divs containing the specific link class from example
-                 result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div:has(a.zReHs)")
-                 if not result_blocks: # If primary fails, fallback to div.g
-                      result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-                 print(f"Found {len(result_blocks)} potential result blocks.")
-            except Exception as find_e:
-                 print(f"Error finding blocks, falling back to 'div.g': {find_e}")
-                 result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-                 print(f"Found {len(result_blocks)} potential result blocks using 'div.g'.")
-
-            if not result_blocks:
+            # One page_source fetch instead of several WebDriver calls per result block
+            entries = parse_results(self.driver.page_source)
+            print(f"Found {len(entries)} LinkedIn profiles on the page.")
+
+            if not entries:
                 print("Warning: No result blocks found.")
-                try: self.driver.save_screenshot('error_no_results_blocks.png')
-                except: pass
+                self.debug_store.capture(self.driver, 'process_page', 'no_results')
                 return
 
-            global_urls = {d['LinkedIn_URL'] for d in self.data if d.get('LinkedIn_URL')}
+            # Scroll through the results once, as a reader would
+            self.driver.execute_script("window.scrollTo({top: document.body.scrollHeight / 2, behavior: 'smooth'});")
+            time.sleep(random.uniform(0.5, 1.0))
+            self.driver.execute_script("window.scrollTo({top: document.body.scrollHeight, behavior: 'smooth'});")
 
-            for i, result_element in enumerate(result_blocks):
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", result_element)
-                    time.sleep(random.uniform(0.1, 0.3))
-                except Exception: pass
-
-                entry = self.extract_profile_data(result_element)
+            global_urls = {d['LinkedIn_URL'] for d in self.data if d.get('LinkedIn_URL')}
 
-                if entry and entry.get('LinkedIn_URL'):
-                    url = entry['LinkedIn_URL']
-                    if url not in global_urls:
-                        self.data.append(entry)
-                        global_urls.add(url)
-                        processed_count += 1
+            page_entries = []
+            for entry in entries:
+                url = canonical_linkedin_url(entry['LinkedIn_URL'])
+                if url is None or url in global_urls:
+                    continue
+                global_urls.add(url)
+                entry['LinkedIn_URL'] = url
+                page_entries.append(entry)
+
+            # The store's insert decides what is new, even with another scraper writing to it
+            new_urls = self.lead_store.record(page_entries, query=self.query, source='Final')
+            for entry in page_entries:
+                if len(self.data) >= self.max_profiles:
+                    break
+                if entry['LinkedIn_URL'] in new_urls:
+                    self.data.append(entry)
+                    processed_count += 1
 
-            print(f"Added {processed_count} new unique profiles from this page.")
+            known = len(page_entries) - len(new_urls)
+            print(f"Added {processed_count} new unique profiles from this page ({known} already collected before).")
 
         except Exception as e:
             print(f"Error processing results page: {str(e)}")
-            try: self.driver.save_screenshot('error_process_page.png')
-            except: pass
+            self.debug_store.capture(self.driver, 'process_page', e)
 
     # --- UPDATED navigate_next_page with JavaScript Click ---
     def navigate_next_page(self):
@@ -299,8 +241,7 @@ class LinkedInScraper:
             # Catches errors during the initial find, scroll, or click attempts
             print(f"An unexpected error occurred during next page navigation: {str(e)}")
             # traceback.print_exc() # Uncomment for full detail if needed
-            try: self.driver.save_screenshot('error_next_page_navigate.png')
-            except: pass
+            self.debug_store.capture(self.driver, 'next_page', e)
             return False
     # --- END UPDATED navigate_next_page ---
 
@@ -319,7 +260,8 @@ class LinkedInScraper:
             print("Invalid number entered. Defaulting to 50 profiles.")
             max_profiles = 50
 
-        query = f'"{designation}" "{city}" site:linkedin.com/in'
+        self.max_profiles = max_profiles
+        query = self.query = f'"{designation}" "{city}" site:linkedin.com/in'
         print(f"\nStarting search for query: {query}")
         print(f"Targeting up to {max_profiles} profiles.")
 
@@ -395,6 +337,8 @@ class LinkedInScraper:
                          print(f"Error saving data to CSV: {csv_e}")
             else:
                 print("\nNo LinkedIn profiles were successfully extracted.")
+            print(f"Lead store: {self.lead_store.lead_count()} leads in total. "
+                  f"Export new ones with: python lead_store.py --since {time.strftime('%Y-%m-%d')}")
 
 if __name__ == "__main__":
     # Ensure necessary libraries are installed:
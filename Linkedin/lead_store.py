@@ -0,0 +1,99 @@
+import argparse
+from datetime import datetime
+from typing import List, Dict, Iterable, Optional, Set
+from profile_index import ProfileIndex, DEFAULT_INDEX, canonical_linkedin_url
+
+LEAD_COLUMNS = ['Name', 'Title', 'Company_Name', 'LinkedIn_URL', 'Query', 'First_Seen', 'Last_Seen']
+
+
+class LeadStore(ProfileIndex):
+    """
+    The profile index plus what was parsed for each profile, kept in the same database.
+
+    Every profile a scraper reaches is recorded: new ones with their name, title, company
+    and the query that found them, known ones get their last-seen date and query bumped.
+    Profiles the lead sourcer adds to the index count as known here too.
+    """
+
+    def __init__(self, db_path=DEFAULT_INDEX, **kwargs):
+        super().__init__(db_path, **kwargs)
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                url TEXT PRIMARY KEY, name TEXT, title TEXT, company TEXT,
+                first_query TEXT, last_query TEXT, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.con.execute("CREATE INDEX IF NOT EXISTS leads_first_seen ON leads (first_seen)")
+
+    def record(self, entries: Iterable[Dict], query: Optional[str] = None, source=None) -> Set[str]:
+        """
+        Store result entries (Name, Title, Company_Name, LinkedIn_URL) in one transaction.
+
+        Returns:
+            canonical URLs of the profiles not seen before by any run or script; decided by
+            the insert itself, so two scrapers recording the same profile cannot both get it
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        added = set()
+        self.con.execute("BEGIN")
+        try:
+            for entry in entries:
+                url = canonical_linkedin_url(entry.get('LinkedIn_URL'))
+                if url is None:
+                    continue
+                if self.add(url, source):
+                    added.add(url)
+                # Keep the first parsed details; fill gaps from later sightings. first_seen comes
+                # from the index, so profiles another script found earlier are not exported as new
+                self.con.execute("""
+                    INSERT INTO leads (url, name, title, company, first_query, last_query, first_seen, last_seen)
+                    SELECT ?, ?, ?, ?, ?, ?, first_seen, ? FROM seen WHERE url = ?
+                    ON CONFLICT (url) DO UPDATE SET
+                        name = COALESCE(name, excluded.name),
+                        title = COALESCE(title, excluded.title),
+                        company = COALESCE(company, excluded.company),
+                        last_query = excluded.last_query,
+                        last_seen = excluded.last_seen
+                """, (url, entry.get('Name'), entry.get('Title'), entry.get('Company_Name'), query, query, now, url))
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        return added
+
+    def leads_since(self, since: str) -> List[Dict]:
+        """Leads first seen at or after `since` (ISO date or timestamp), oldest first"""
+        rows = self.con.execute("""
+            SELECT name, title, company, url, first_query, first_seen, last_seen
+            FROM leads WHERE first_seen >= ? ORDER BY first_seen
+        """, (since,))
+        return [dict(zip(LEAD_COLUMNS, row)) for row in rows]
+
+    def lead_count(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Export new leads from the shared LinkedIn lead store")
+
+    parser.add_argument("--db", type=str, default=DEFAULT_INDEX, help="Lead database file")
+    parser.add_argument("--since", type=str, default=datetime.now().strftime('%Y-%m-%d'),
+                        help="Export leads first seen on or after this date/time (default: today)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Delta workbook to write (default: linkedin_leads_since_<date>.xlsx)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    args = parse_arguments()
+    with LeadStore(args.db, bloom=False) as store:
+        leads = store.leads_since(args.since)
+        print(f"{len(leads)} leads first seen since {args.since} ({store.lead_count()} in {args.db})")
+        if leads:
+            output = args.output or f"linkedin_leads_since_{args.since[:10]}.xlsx"
+            pd.DataFrame(leads, columns=LEAD_COLUMNS).to_excel(output, index=False, engine='openpyxl')
+            print(f"Saved to '{output}'")
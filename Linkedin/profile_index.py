@@ -0,0 +1,186 @@
+import os
+import re
+import math
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from urllib.parse import urlsplit, unquote
+from typing import Optional, Iterable
+
+# Shared by Final.py, reframe.py and "Email Address Scraper/linkedin lead sourcer.py"
+DEFAULT_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linkedin_profiles_seen.sqlite')
+
+_PROFILE_PATH = re.compile(r'^/(in|pub)/(.+)$')
+
+
+def canonical_linkedin_url(url: Optional[str]) -> Optional[str]:
+    """
+    One spelling per profile: https://www.linkedin.com/in/<slug>, lower-case, decoded,
+    without country subdomain, query, fragment, trailing slash or sub-page
+    (e.g. /in/x/en, /in/x/details/experience).
+
+    Returns None when the URL is not a LinkedIn profile.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    # Decode nested percent-encoding, e.g. from Google redirect links
+    for _ in range(3):
+        decoded = unquote(url)
+        if decoded == url:
+            break
+        url = decoded
+    if '://' not in url:
+        url = 'https://' + url.lstrip('/')
+
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host != 'linkedin.com' and not host.endswith('.linkedin.com'):
+        return None
+
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/').lower()
+    match = _PROFILE_PATH.match(path)
+    if not match:
+        return None
+    kind, rest = match.groups()
+    segments = rest.split('/')
+    # /in/<slug>[/sub-page]; old /pub/<name>/<a>/<b>/<c> URLs keep all four parts
+    slug = '/'.join(segments[:4]) if kind == 'pub' else segments[0]
+    if not slug:
+        return None
+    return f"https://www.linkedin.com/{kind}/{slug}"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter: no false negatives, `error_rate` false positives at `capacity` items"""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class ProfileIndex:
+    """
+    Profiles already collected, on disk so it holds across runs and scripts.
+
+    URLs are stored canonical (canonical_linkedin_url). With `bloom=True` a Bloom filter
+    loaded from the table answers most lookups of unseen profiles without a disk read.
+    Other scripts may write to the same database; whenever SQLite's data_version shows
+    another connection has committed, the filter is topped up from the table before it
+    is trusted with a miss.
+    """
+
+    def __init__(self, db_path=DEFAULT_INDEX, bloom=True, bloom_capacity=1_000_000):
+        self.con = sqlite3.connect(str(db_path), isolation_level=None)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                url TEXT PRIMARY KEY, source TEXT, first_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.bloom = None
+        self._data_version = None
+        if bloom:
+            self.bloom = BloomFilter(max(bloom_capacity, 2 * len(self)))
+            self._refresh_bloom()
+
+    def _refresh_bloom(self):
+        """Add to the filter what other connections committed since it was last loaded"""
+        # data_version only changes for commits made by other connections
+        version = self.con.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        for (url,) in self.con.execute("SELECT url FROM seen"):
+            self.bloom.add(url)
+
+    def __len__(self):
+        return self.con.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def __contains__(self, url):
+        url = canonical_linkedin_url(url)
+        if url is None:
+            return False
+        if self.bloom is not None:
+            self._refresh_bloom()
+            if url not in self.bloom:
+                return False
+        return self.con.execute("SELECT 1 FROM seen WHERE url = ?", (url,)).fetchone() is not None
+
+    def add(self, url, source=None) -> bool:
+        """Record a profile; True if it was not seen before (in any run or script)"""
+        url = canonical_linkedin_url(url)
+        if url is None:
+            return False
+        if self.bloom is not None and url not in self.bloom:
+            self.bloom.add(url)
+        cursor = self.con.execute(
+            "INSERT OR IGNORE INTO seen (url, source, first_seen) VALUES (?, ?, ?)",
+            (url, source, datetime.now().isoformat(timespec='seconds'))
+        )
+        return cursor.rowcount == 1
+
+    def add_many(self, urls: Iterable[str], source=None) -> int:
+        """Record several profiles in one transaction; returns how many were new"""
+        added = 0
+        self.con.execute("BEGIN")
+        try:
+            for url in urls:
+                added += self.add(url, source)
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        return added
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Inspect or seed the shared LinkedIn profile index")
+
+    parser.add_argument("--db", type=str, default=DEFAULT_INDEX, help="Index database file")
+    parser.add_argument("--import", dest="imports", nargs="+", default=None,
+                        help="Earlier .xlsx/.csv results whose LinkedIn URLs should count as seen")
+    parser.add_argument("--check", nargs="+", default=None, help="URLs to look up")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with ProfileIndex(args.db) as index:
+        for path in args.imports or []:
+            import pandas as pd
+            df = pd.read_excel(path) if path.lower().endswith('.xlsx') else pd.read_csv(path)
+            columns = [c for c in df.columns if 'linkedin' in str(c).lower() and 'url' in str(c).lower()]
+            urls = [u for c in columns for u in df[c].dropna().astype(str)]
+            print(f"{path}: {index.add_many(urls, source=os.path.basename(path))} new of {len(urls)} URLs")
+
+        for url in args.check or []:
+            print(f"{'seen' if url in index else 'new '}  {canonical_linkedin_url(url) or '(not a profile URL)'}")
+        print(f"{len(index)} profiles in {args.db}")
@@ -0,0 +1,59 @@
+from collections import defaultdict
+from typing import List, Dict, Tuple
+
+# Everything before this in a generated query is the base search, everything after the extra term
+SITE_FILTER = 'site:linkedin.com/in'
+
+
+class QueryScheduler:
+    """
+    Decides which search query to run next and when to give up on one, from the number
+    of new profiles each results page produced.
+
+    Args:
+        min_yield: new profiles per page below which a query is dropped
+        window: pages averaged for that decision; every query gets at least this many
+        prior: yield assumed for a base search or extra term with no pages yet,
+               so untried variants still get their turn
+    """
+
+    def __init__(self, min_yield=1.0, window=2, prior=5.0):
+        self.min_yield = min_yield
+        self.window = window
+        self.prior = prior
+        self.history: List[Tuple[str, int]] = []  # (query, new profiles) per page, in order
+        self._query_yields: Dict[str, List[int]] = defaultdict(list)
+        self._feature_yields: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+
+    @staticmethod
+    def features(query: str):
+        """The base search and the extra term of a generate_search_queries variant"""
+        base, _, term = query.partition(SITE_FILTER)
+        return ('base', base.strip()), ('term', term.strip())
+
+    def record_page(self, query: str, new_profiles: int):
+        self.history.append((query, new_profiles))
+        self._query_yields[query].append(new_profiles)
+        for feature in self.features(query):
+            self._feature_yields[feature].append(new_profiles)
+
+    def _mean(self, yields):
+        return sum(yields) / len(yields) if yields else self.prior
+
+    def expected_yield(self, query: str) -> float:
+        """New profiles per page so far from queries sharing its base search and its extra term"""
+        return sum(self._mean(self._feature_yields.get(f)) for f in self.features(query)) / 2
+
+    def should_drop(self, query: str) -> bool:
+        """True once the query's last `window` pages averaged below min_yield"""
+        recent = self._query_yields.get(query, [])[-self.window:]
+        return len(recent) >= self.window and self._mean(recent) < self.min_yield
+
+    def should_skip(self, query: str) -> bool:
+        """True when both its base search and extra term have been tried and are below min_yield"""
+        tried = all(len(self._feature_yields.get(f, [])) >= self.window for f in self.features(query))
+        return tried and self.expected_yield(query) < self.min_yield
+
+    def prioritize(self, queries: List[str]) -> List[str]:
+        """Highest expected yield first; ties keep the generated order"""
+        return sorted(queries, key=self.expected_yield, reverse=True)
@@ -12,11 +12,17 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 # Use undetected_chromedriver consistently
 import undetected_chromedriver as uc
-# Need this to parse the Google redirect URL
-from urllib.parse import urlparse, parse_qs, unquote
 from fake_useragent import UserAgent
 from typing import List, Dict, Optional, Set
 import traceback # For detailed errors if needed
+from serp_parser import parse_results
+from profile_index import canonical_linkedin_url
+from lead_store import LeadStore
+from query_scheduler import QueryScheduler
+import sys
+# Shared bounded store for failure screenshots and page sources
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'E-Vahan Data Scraper', 'Utilities'))
+from debug_artifacts import DebugArtifactStore
 
 class LinkedInScraper:
     def __init__(self):
@@ -24,13 +30,20 @@ class LinkedInScraper:
         self.data: List[Dict] = []
         self.ua = UserAgent()
         self.window_sizes = [(1366, 768), (1440, 900), (1536, 864), (1920, 1080)]
-        self.checkpoint_file = "linkedin_scrape_checkpoint.json"
-        self.visited_urls: Set[str] = set()
+        self.checkpoint_file = "linkedin_scrape_checkpoint.jsonl"
+        self._checkpoint_started = False  # session record written to the journal
+        self._saved_profiles = 0  # profiles in self.data already in the journal
+        self._saved_cursor = None
+        self._saved_pages = 0  # scheduler page yields already in the journal
+        self.visited_urls: Set[str] = set()  # canonical URLs seen this session
+        self.lead_store = LeadStore()  # profiles collected by any run, shared with the other scrapers
         self.current_query_page = 0
         self.total_pages_scraped = 0
         self.queries = []
         self.current_query_index = 0
+        self.scheduler = QueryScheduler()  # query order and early stop from new-profile yield
         self.max_profiles = 50  # Default, will be updated
+        self.debug_store = DebugArtifactStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug"))
 
     def setup_driver(self) -> uc.Chrome:
         """Sets up undetected_chromedriver, letting it auto-detect the version."""
@@ -160,81 +173,17 @@ class LinkedInScraper:
 
         except Exception as e:
             print(f"Failed during search navigation/input: {str(e)}")
-            try: self.driver.save_screenshot(f'error_search_page_{time.strftime("%Y%m%d_%H%M%S")}.png')
-            except: pass
+            self.debug_store.capture(self.driver, 'search_page', e, query=query)
             raise
 
     def extract_profile_data(self, result_element):
         """
         Extracts core data from a single Google search result block,
-        targeting the structure shown in the example HTML.
+        parsing its HTML in one round trip (see serp_parser).
         """
-        entry = {'Name': None, 'Title': None, 'Company_Name': None, 'LinkedIn_URL': None}
         try:
-            link_element = None
-            google_href = None
-            try:
-                link_element = WebDriverWait(result_element, 2).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.zReHs")) # Specific link class from example
-                )
-            except (TimeoutException, NoSuchElementException):
-                 try: # Fallback 1: Common structure
-                      link_element = WebDriverWait(result_element, 1).until(
-                           EC.presence_of_element_located((By.CSS_SELECTOR, "div.yuRUbf > a"))
-                      )
-                 except (TimeoutException, NoSuchElementException):
-                      try: # Fallback 2: Any link within the block
-                           link_element = result_element.find_element(By.TAG_NAME, "a")
-                      except NoSuchElementException:
-                           return None # No link found
-
-            google_href = link_element.get_attribute('href')
-            if not google_href: return None
-
-            try:
-                parsed_url = urlparse(google_href)
-                query_params = parse_qs(parsed_url.query)
-                actual_urls = query_params.get('url', [])
-                if actual_urls:
-                    entry['LinkedIn_URL'] = unquote(actual_urls[0])
-                elif 'linkedin.com/in/' in google_href or 'linkedin.com/pub/' in google_href: # Check if href is direct URL
-                     entry['LinkedIn_URL'] = google_href
-                else: return None
-
-                if not entry['LinkedIn_URL'] or not ('linkedin.com/in/' in entry['LinkedIn_URL'] or 'linkedin.com/pub/' in entry['LinkedIn_URL']):
-                    return None
-            except Exception: return None # Error during URL parsing
-
-            full_title = None
-            try:
-                title_element = link_element.find_element(By.CSS_SELECTOR, "h3.LC20lb") # Specific class from example
-                full_title = title_element.text.strip()
-            except NoSuchElementException:
-                 try: # Fallback to generic H3
-                      title_element = link_element.find_element(By.TAG_NAME, "h3")
-                      full_title = title_element.text.strip()
-                 except NoSuchElementException: pass
-
-            if full_title:
-                parts = full_title.split(' - ', 1)
-                entry['Name'] = parts[0].strip()
-                if len(parts) > 1:
-                    title_company_part = parts[1]
-                    title_company_split = title_company_part.split(' - ', 1)
-                    entry['Title'] = title_company_split[0].strip()
-                    if len(title_company_split) > 1:
-                        entry['Company_Name'] = title_company_split[1].replace('...', '').strip()
-                    else: entry['Title'] = title_company_part.strip() # Whole part is title if no second hyphen
-                else: entry['Name'] = full_title # Assume whole H3 is Name if no hyphen
-
-            # Fallback name extraction from URL
-            if not entry['Name'] and entry['LinkedIn_URL']:
-                 url_name_match = re.search(r'/in/([\w-]+)', entry['LinkedIn_URL'])
-                 if url_name_match:
-                     name_from_url = url_name_match.group(1).replace('-', ' ').title()
-                     entry['Name'] = re.sub(r'\s+\w*\d+\w*$', '', name_from_url).strip()
-
-            return entry
+            entries = parse_results(result_element.get_attribute('outerHTML'))
+            return entries[0] if entries else None
         except Exception:
             return None
 
@@ -247,90 +196,166 @@ class LinkedInScraper:
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'div#search'))
             )
 
-            result_blocks = []
-            try:
-                 # Try multiple selector strategies for better coverage
-                 result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div:has(a.zReHs)")
-                 if not result_blocks:
-                      result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-                 if not result_blocks:
-                      result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div[data-sokoban-container]")
-                 print(f"Found {len(result_blocks)} potential result blocks.")
-            except Exception as find_e:
-                 print(f"Error finding blocks, falling back to 'div.g': {find_e}")
-                 result_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-                 print(f"Found {len(result_blocks)} potential result blocks using 'div.g'.")
-
-            if not result_blocks:
+            # One page_source fetch instead of several WebDriver calls per result block
+            entries = parse_results(self.driver.page_source)
+            print(f"Found {len(entries)} LinkedIn profiles on the page.")
+
+            if not entries:
                 print("Warning: No result blocks found.")
-                try: self.driver.save_screenshot(f'error_no_results_blocks_{time.strftime("%Y%m%d_%H%M%S")}.png')
-                except: pass
+                self.debug_store.capture(self.driver, 'process_page', 'no_results')
+                self.scheduler.record_page(self.queries[self.current_query_index], 0)
                 return
 
-            for i, result_element in enumerate(result_blocks):
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", result_element)
-                    time.sleep(random.uniform(0.1, 0.3))
-                except Exception: pass
-
-                entry = self.extract_profile_data(result_element)
-
-                if entry and entry.get('LinkedIn_URL'):
-                    url = entry['LinkedIn_URL']
-                    if url not in self.visited_urls:
-                        self.data.append(entry)
-                        self.visited_urls.add(url)
-                        processed_count += 1
-
-            print(f"Added {processed_count} new unique profiles from this page.")
+            # Scroll through the results once, as a reader would
+            self.driver.execute_script("window.scrollTo({top: document.body.scrollHeight / 2, behavior: 'smooth'});")
+            time.sleep(random.uniform(0.5, 1.0))
+            self.driver.execute_script("window.scrollTo({top: document.body.scrollHeight, behavior: 'smooth'});")
+
+            page_entries = []
+            for entry in entries:
+                url = canonical_linkedin_url(entry['LinkedIn_URL'])
+                if url is None or url in self.visited_urls:
+                    continue
+                self.visited_urls.add(url)
+                entry['LinkedIn_URL'] = url
+                page_entries.append(entry)
+
+            # Store first: a profile in the checkpoint is skipped on resume, so it must already be in the
+            # store; one in the store but not the checkpoint is still exported by lead_store.py --since.
+            # The store's insert also decides what is new, even with another scraper writing to it
+            new_urls = self.lead_store.record(page_entries, query=self.queries[self.current_query_index], source='reframe')
+            for entry in page_entries:
+                if len(self.data) >= self.max_profiles:
+                    break
+                if entry['LinkedIn_URL'] in new_urls:
+                    self.data.append(entry)
+                    processed_count += 1
+
+            known = len(page_entries) - len(new_urls)
+            print(f"Added {processed_count} new unique profiles from this page ({known} already collected before).")
+            self.scheduler.record_page(self.queries[self.current_query_index], processed_count)
             self.save_checkpoint()
 
         except Exception as e:
             print(f"Error processing results page: {str(e)}")
-            try: self.driver.save_screenshot(f'error_process_page_{time.strftime("%Y%m%d_%H%M%S")}.png')
-            except: pass
-
-    def save_checkpoint(self):
-        """Save current progress to allow resuming."""
-        checkpoint_data = {
-            "data": self.data,
-            "visited_urls": list(self.visited_urls),
+            self.debug_store.capture(self.driver, 'process_page', e)
+
+    def _checkpoint_records(self):
+        """Records that rebuild the full current state: session, every profile, cursor."""
+        yield {"type": "session", "max_profiles": self.max_profiles, "queries": self.queries}
+        for entry in self.data:
+            yield {"type": "profile", "entry": entry}
+        for query, new_profiles in self.scheduler.history:
+            yield {"type": "page", "query": query, "new": new_profiles}
+        yield self._cursor_record()
+
+    def _cursor_record(self):
+        return {
+            "type": "cursor",
             "current_query_index": self.current_query_index,
             "current_query_page": self.current_query_page,
             "total_pages_scraped": self.total_pages_scraped,
-            "max_profiles": self.max_profiles,
-            "queries": self.queries
         }
 
+    def _append_checkpoint(self, records):
+        with open(self.checkpoint_file, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save_checkpoint(self):
+        """
+        Save current progress to allow resuming.
+
+        The checkpoint is an append-only JSONL journal: only profiles found since the last
+        save and a changed cursor are written, so a save costs the same on page 1 and
+        page 300, and a crash can at most tear the last line.
+        """
         try:
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(checkpoint_data, f)
+            if not self._checkpoint_started:
+                # New session: start a fresh journal
+                if os.path.exists(self.checkpoint_file):
+                    os.remove(self.checkpoint_file)
+                self._append_checkpoint([{"type": "session", "max_profiles": self.max_profiles, "queries": self.queries}])
+                self._checkpoint_started = True
+
+            records = [{"type": "profile", "entry": entry} for entry in self.data[self._saved_profiles:]]
+            records += [{"type": "page", "query": query, "new": new_profiles}
+                        for query, new_profiles in self.scheduler.history[self._saved_pages:]]
+            cursor = self._cursor_record()
+            if cursor != self._saved_cursor:
+                records.append(cursor)
+            if records:
+                self._append_checkpoint(records)
+            self._saved_profiles = len(self.data)
+            self._saved_pages = len(self.scheduler.history)
+            self._saved_cursor = cursor
             print(f"Checkpoint saved: {len(self.data)} profiles, {self.total_pages_scraped} pages")
         except Exception as e:
             print(f"Failed to save checkpoint: {e}")
 
+    def compact_checkpoint(self):
+        """Rewrite the journal as one session record, the profiles and the last cursor."""
+        temp_file = self.checkpoint_file + ".tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record) + "\n" for record in self._checkpoint_records())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.checkpoint_file)
+            self._checkpoint_started = True
+            self._saved_profiles = len(self.data)
+            self._saved_pages = len(self.scheduler.history)
+            self._saved_cursor = self._cursor_record()
+        except Exception as e:
+            print(f"Failed to compact checkpoint: {e}")
+
     def load_checkpoint(self):
-        """Load checkpoint if available."""
+        """Load checkpoint if available, replaying the journal line by line."""
         if not os.path.exists(self.checkpoint_file):
             return False
 
         try:
-            with open(self.checkpoint_file, 'r') as f:
-                checkpoint_data = json.load(f)
+            session, schedule = None, None
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash mid-write
+
+                    if record["type"] == "session":
+                        session = record
+                    elif record["type"] == "profile":
+                        url = canonical_linkedin_url(record["entry"].get("LinkedIn_URL"))
+                        if url not in self.visited_urls:
+                            self.data.append(record["entry"])
+                            self.visited_urls.add(url)
+                    elif record["type"] == "page":
+                        self.scheduler.record_page(record["query"], record["new"])
+                    elif record["type"] == "schedule":
+                        schedule = record["queries"]
+                    elif record["type"] == "cursor":
+                        self.current_query_index = record["current_query_index"]
+                        self.current_query_page = record["current_query_page"]
+                        self.total_pages_scraped = record["total_pages_scraped"]
+
+            if session is None:
+                print("Checkpoint has no session record, starting fresh")
+                self.data, self.visited_urls = [], set()
+                return False
+            self.max_profiles = session["max_profiles"]
+            self.queries = schedule or session["queries"]
 
-            self.data = checkpoint_data["data"]
-            self.visited_urls = set(checkpoint_data["visited_urls"])
-            self.current_query_index = checkpoint_data["current_query_index"]
-            self.current_query_page = checkpoint_data["current_query_page"]
-            self.total_pages_scraped = checkpoint_data["total_pages_scraped"]
-            self.max_profiles = checkpoint_data["max_profiles"]
-            self.queries = checkpoint_data["queries"]
+            # Drop the cursor history of the previous run before appending to it
+            self.compact_checkpoint()
 
             print(f"Checkpoint loaded: {len(self.data)} profiles, {self.total_pages_scraped} pages")
             print(f"Resuming from query {self.current_query_index+1}/{len(self.queries)}, page {self.current_query_page+1}")
             return True
         except Exception as e:
             print(f"Failed to load checkpoint: {e}")
+            self.data, self.visited_urls = [], set()
             return False
 
     def navigate_next_page(self):
@@ -397,8 +422,7 @@ class LinkedInScraper:
             # Catches errors during the initial find, scroll, or click attempts
             print(f"An unexpected error occurred during next page navigation: {str(e)}")
             # traceback.print_exc() # Uncomment for full detail if needed
-            try: self.driver.save_screenshot(f'error_next_page_navigate_{time.strftime("%Y%m%d_%H%M%S")}.png')
-            except: pass
+            self.debug_store.capture(self.driver, 'next_page', e)
             return False
 
     def restart_browser(self):
@@ -441,10 +465,7 @@ class LinkedInScraper:
         print("CAPTCHA detected! Taking action...")
 
         # Save screenshot for manual inspection
-        try:
-            self.driver.save_screenshot(f'captcha_detected_{time.strftime("%Y%m%d_%H%M%S")}.png')
-        except Exception:
-            pass
+        self.debug_store.capture(self.driver, 'captcha', 'captcha')
 
         # Save checkpoint before handling
         self.save_checkpoint()
@@ -518,8 +539,25 @@ class LinkedInScraper:
             max_browser_restarts = 5
 
             while self.current_query_index < len(self.queries) and len(self.data) < self.max_profiles:
+                if self.current_query_page == 0:
+                    # Run the remaining queries best expected yield first
+                    remaining = self.scheduler.prioritize(self.queries[self.current_query_index:])
+                    if remaining != self.queries[self.current_query_index:]:
+                        self.queries[self.current_query_index:] = remaining
+                        if self._checkpoint_started:
+                            try:
+                                self._append_checkpoint([{"type": "schedule", "queries": self.queries}])
+                            except Exception as e:
+                                print(f"Failed to save query order: {e}")
+
                 current_query = self.queries[self.current_query_index]
 
+                if self.current_query_page == 0 and self.scheduler.should_skip(current_query):
+                    print(f"\n=== Skipping query ({self.current_query_index+1}/{len(self.queries)}): {current_query} "
+                          f"(similar queries averaged {self.scheduler.expected_yield(current_query):.1f} new profiles per page) ===")
+                    self.current_query_index += 1
+                    continue
+
                 if self.current_query_page == 0:
                     print(f"\n=== Starting new query ({self.current_query_index+1}/{len(self.queries)}): {current_query} ===")
                     self.perform_search(current_query)
@@ -585,6 +623,11 @@ class LinkedInScraper:
                         print(f"\nTarget number of profiles ({self.max_profiles}) reached.")
                         break
 
+                    if self.scheduler.should_drop(current_query):
+                        print(f"\nQuery yield fell below {self.scheduler.min_yield} new profiles per page "
+                              f"over the last {self.scheduler.window} pages. Moving to next query.")
+                        break
+
                     # Add longer random delay between page navigations to avoid detection
                     page_delay = random.uniform(5, 15) if self.current_query_page % 5 == 0 else random.uniform(3, 7)
                     print(f"Pausing for {page_delay:.1f} seconds before next page...")
@@ -627,6 +670,7 @@ class LinkedInScraper:
                 print("Closing browser window...")
                 self.driver.quit()
 
+            saved = False
             if self.data:
                 final_data = self.data[:self.max_profiles]
                 print(f"\nPreparing data for saving ({len(final_data)} entries)...")
@@ -651,12 +695,14 @@ class LinkedInScraper:
                         try:
                             chunk.to_excel(output_filename, index=False, engine='openypxl')
                             print(f"Successfully saved {len(chunk)} profiles to '{output_filename}'")
+                            saved = True
                         except Exception as save_e:
                             print(f"Error saving data chunk {i+1} to Excel: {save_e}")
                             csv_filename = output_filename.replace('.xlsx', '.csv')
                             try:
                                 chunk.to_csv(csv_filename, index=False)
                                 print(f"Successfully saved {len(chunk)} profiles to '{csv_filename}'")
+                                saved = True
                             except Exception as csv_e:
                                 print(f"Error saving data chunk {i+1} to CSV: {csv_e}")
                 else:
@@ -664,15 +710,23 @@ class LinkedInScraper:
                     try:
                         df.to_excel(output_filename, index=False, engine='openpyxl')
                         print(f"\nSuccessfully saved {len(df)} profiles to '{output_filename}'")
+                        saved = True
                     except Exception as save_e:
                         print(f"\nError saving data to Excel: {save_e}")
                         csv_filename = output_filename.replace('.xlsx', '.csv')
                         try:
                             df.to_csv(csv_filename, index=False)
                             print(f"Successfully saved {len(df)} profiles to '{csv_filename}'")
+                            saved = True
                         except Exception as csv_e:
                             print(f"Error saving data to CSV: {csv_e}")
 
+            else:
+                print("\nNo LinkedIn profiles were successfully extracted.")
+            print(f"Lead store: {self.lead_store.lead_count()} leads in total. "
+                  f"Export new ones with: python lead_store.py --since {time.strftime('%Y-%m-%d')}")
+
+            if saved:
                 # Delete checkpoint file after successful completion
                 try:
                     if os.path.exists(self.checkpoint_file):
@@ -680,8 +734,9 @@ class LinkedInScraper:
                         print("Checkpoint file removed after successful completion.")
                 except Exception as e:
                     print(f"Failed to remove checkpoint file: {e}")
-            else:
-                print("\nNo LinkedIn profiles were successfully extracted.")
+            elif self._checkpoint_started:
+                # Keep the journal for a resume, folded down to its current state
+                self.compact_checkpoint()
 
 # Example usage (add this outside the class definition)
 if __name__ == "__main__":
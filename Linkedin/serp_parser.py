@@ -0,0 +1,156 @@
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+from urllib.parse import urlparse, parse_qs, unquote
+from typing import List, Dict, Optional
+from lxml import html
+
+# The selectors LinkedInScraper used per result element, as XPath so no cssselect is needed
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Result blocks, tried in order: "div:has(a.zReHs)", "div.g", "div[data-sokoban-container]"
+BLOCK_XPATHS = [
+    # Innermost div holding the link, rather than every ancestor that :has() also matches
+    f"//div[.//a[{_has_class('zReHs')}] and not(.//div[.//a[{_has_class('zReHs')}]])]",
+    f"//div[{_has_class('g')}]",
+    "//div[@data-sokoban-container]",
+]
+# Link inside a block: "a.zReHs", "div.yuRUbf > a", first "a"
+LINK_XPATHS = [
+    f".//a[{_has_class('zReHs')}]",
+    f".//div[{_has_class('yuRUbf')}]/a",
+    ".//a",
+]
+# Title inside the link: "h3.LC20lb", first "h3"
+TITLE_XPATHS = [
+    f".//h3[{_has_class('LC20lb')}]",
+    ".//h3",
+]
+
+
+def _first(element, xpaths):
+    for xpath in xpaths:
+        found = element.xpath(xpath)
+        if found:
+            return found[0]
+    return None
+
+
+def linkedin_url_from_href(href: str) -> Optional[str]:
+    """The profile URL behind a result link: Google's /url?url=... redirect or a direct link"""
+    if not href:
+        return None
+    actual_urls = parse_qs(urlparse(href).query).get('url', [])
+    url = unquote(actual_urls[0]) if actual_urls else href
+    if 'linkedin.com/in/' in url or 'linkedin.com/pub/' in url:
+        return url
+    return None
+
+
+def split_result_title(full_title: Optional[str], linkedin_url: str) -> Dict:
+    """Name, Title and Company_Name from a "Name - Title - Company" result heading"""
+    entry = {'Name': None, 'Title': None, 'Company_Name': None, 'LinkedIn_URL': linkedin_url}
+    if full_title:
+        parts = full_title.split(' - ', 1)
+        entry['Name'] = parts[0].strip()
+        if len(parts) > 1:
+            title_company_split = parts[1].split(' - ', 1)
+            entry['Title'] = title_company_split[0].strip()
+            if len(title_company_split) > 1:
+                entry['Company_Name'] = title_company_split[1].replace('...', '').strip()
+
+    # Fallback name extraction from URL
+    if not entry['Name']:
+        url_name_match = re.search(r'/in/([\w-]+)', linkedin_url)
+        if url_name_match:
+            name_from_url = url_name_match.group(1).replace('-', ' ').title()
+            entry['Name'] = re.sub(r'\s+\w*\d+\w*$', '', name_from_url).strip()
+    return entry
+
+
+def parse_results(source) -> List[Dict]:
+    """
+    Every LinkedIn profile on a Google results page, from its HTML.
+
+    Args:
+        source: page HTML (str or bytes), e.g. driver.page_source
+
+    Returns:
+        one entry dict per distinct profile URL, in page order
+    """
+    if not source or not source.strip():
+        return []
+    tree = html.fromstring(source)
+    blocks = []
+    for xpath in BLOCK_XPATHS:
+        blocks = tree.xpath(xpath)
+        if blocks:
+            break
+
+    entries, seen = [], set()
+    for block in blocks:
+        link = _first(block, LINK_XPATHS)
+        if link is None:
+            continue
+        url = linkedin_url_from_href(link.get('href'))
+        if not url or url in seen:
+            continue
+        title = _first(link, TITLE_XPATHS)
+        full_title = ' '.join(title.text_content().split()) if title is not None else None
+        entries.append(split_result_title(full_title, url))
+        seen.add(url)
+    return entries
+
+
+def parse_file(path) -> List[Dict]:
+    with open(path, 'rb') as f:
+        return parse_results(f.read())
+
+
+def benchmark(paths, repeat=50):
+    """Print the mean parse time and profile count of each page"""
+    print(f"{'Page':<40} {'KB':>8} {'Profiles':>9} {'ms/page':>9}")
+    for path in paths:
+        with open(path, 'rb') as f:
+            source = f.read()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            entries = parse_results(source)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{os.path.basename(path):<40} {len(source) / 1024:>8.1f} {len(entries):>9} {elapsed:>9.2f}")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Extract LinkedIn profiles from saved Google results pages")
+
+    parser.add_argument("pages", nargs="*",
+                        default=[os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'serp')],
+                        help="Saved .html pages or folders of them (default: the bundled fixtures)")
+    parser.add_argument("--benchmark", action="store_true", help="Time the parser on each page")
+    parser.add_argument("--repeat", type=int, default=50, help="Parses per page for --benchmark")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    paths = []
+    for page in args.pages:
+        paths.extend(sorted(glob.glob(os.path.join(page, '*.html'))) if os.path.isdir(page) else [page])
+    if not paths:
+        print("No pages found")
+        sys.exit(1)
+
+    if args.benchmark:
+        benchmark(paths, args.repeat)
+    else:
+        for path in paths:
+            entries = parse_file(path)
+            print(f"\n{path}: {len(entries)} profiles")
+            for entry in entries:
+                print(f"  {entry['Name']} | {entry['Title']} | {entry['Company_Name']} | {entry['LinkedIn_URL']}")